@@ -1,10 +1,15 @@
 """AWS ALB manager for MCP Orchestrator."""
 
-import boto3
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# boto3 and requests are slow to import and only needed once AWS is used,
+# so they are imported lazily. botocore.exceptions is cheap on its own.
 from botocore.exceptions import ClientError
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 from orchestrator.utils.logging import setup_logging
 from orchestrator.config_manager import ConfigManager
 from orchestrator.compose_manager import ComposeManager
@@ -12,6 +17,160 @@ from orchestrator.compose_manager import ComposeManager
 # Set up logger
 logger = setup_logging(__name__)
 
+# AWS error codes that indicate a transient condition worth retrying
+RETRYABLE_ERROR_CODES = frozenset({
+    'Throttling',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'ServiceUnavailable',
+    'TooManyRequestsException'
+})
+
+# AWS error codes returned when the IAM policy does not allow a call
+ACCESS_DENIED_ERROR_CODES = frozenset({
+    'AccessDenied',
+    'AccessDeniedException'
+})
+
+
+def _is_retryable(exception: BaseException) -> bool:
+    """Check if an exception is a transient AWS error.
+    
+    Args:
+        exception: The exception raised by an AWS call
+        
+    Returns:
+        True if the call should be retried, False otherwise
+    """
+    return (isinstance(exception, ClientError)
+            and exception.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES)
+
+
+# Retry policy for AWS calls that create or update resources.
+# Permanent errors (bad configuration, duplicates, ...) fail fast instead of being retried.
+aws_retry = retry(
+    stop=stop_after_attempt(2),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_exception(_is_retryable),
+    reraise=True
+)
+
+# EC2 instance metadata service (IMDSv2) endpoints
+IMDS_TOKEN_URL = 'http://169.254.169.254/latest/api/token'
+IMDS_INSTANCE_ID_URL = 'http://169.254.169.254/latest/meta-data/instance-id'
+
+# Instance ID used when the metadata service doesn't answer, e.g. when not running on EC2
+DUMMY_INSTANCE_ID = 'i-dummy'
+
+# Shared session so metadata requests reuse a kept-alive connection, created on first use
+_IMDS_SESSION = None
+
+
+def _get_imds_session() -> Any:
+    """Get the shared metadata service session, creating it on first use.
+    
+    Returns:
+        The shared requests session
+    """
+    global _IMDS_SESSION
+    if _IMDS_SESSION is None:
+        import requests
+        
+        session = requests.Session()
+        session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        _IMDS_SESSION = session
+    return _IMDS_SESSION
+
+# Translation table mapping every non-alphanumeric character to a dash, for target group names
+_TARGET_GROUP_NAME_TABLE = str.maketrans({
+    chr(c): '-' for c in range(256) if chr(c) not in string.ascii_letters + string.digits
+})
+
+# boto3 clients are thread-safe, so one client per service and configuration is
+# shared by every ALBManager in the process instead of each building its own
+_SHARED_CLIENTS: Dict[tuple, Any] = {}
+_SHARED_CLIENTS_LOCK = threading.Lock()
+
+
+def _get_shared_client(service_name: str, region: str, max_pool_connections: int) -> Any:
+    """Get a boto3 client, creating it on first use.
+    
+    Args:
+        service_name: AWS service name, e.g. elbv2
+        region: AWS region
+        max_pool_connections: Size of the client's HTTP connection pool
+        
+    Returns:
+        The shared boto3 client
+    """
+    key = (service_name, region, max_pool_connections)
+    with _SHARED_CLIENTS_LOCK:
+        if key not in _SHARED_CLIENTS:
+            import boto3
+            from botocore.config import Config
+            
+            # Keep connections alive in a pool and let botocore back off adaptively when throttled
+            config = Config(
+                region_name=region,
+                max_pool_connections=max_pool_connections,
+                tcp_keepalive=True,
+                retries={'mode': 'adaptive', 'max_attempts': 10}
+            )
+            _SHARED_CLIENTS[key] = boto3.client(service_name, config=config)
+        return _SHARED_CLIENTS[key]
+
+
+# Number of servers whose ALB resources are reconciled concurrently during a sync.
+# Must not exceed aws.max_pool_connections or requests will wait for a free connection.
+SYNC_MAX_WORKERS = 8
+
+# Maximum number of resource ARNs accepted by a single DescribeTags call
+DESCRIBE_TAGS_BATCH_SIZE = 20
+
+
+class _ListenerRules:
+    """Listener rules listed for one sync pass, indexed by path pattern.
+    
+    Each sync lists its own copy, so concurrent syncs never see each other's.
+    Callers changing the rules hold ALBManager._rules_lock.
+    """
+    
+    __slots__ = ('rules', 'by_path')
+    
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules = rules
+        self.by_path: Dict[str, Dict[str, Any]] = {}  # Maps path pattern -> rule
+        for rule in rules:
+            self._index(rule)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.rules)
+    
+    def _index(self, rule: Dict[str, Any]) -> None:
+        for condition in rule.get('Conditions', []):
+            if condition.get('Field') == 'path-pattern':
+                for value in condition.get('Values', []):
+                    # Keep the first rule for a path, as a linear scan would find it
+                    self.by_path.setdefault(value, rule)
+    
+    def add(self, rule: Dict[str, Any]) -> None:
+        """Add a newly created rule."""
+        self.rules.append(rule)
+        self._index(rule)
+    
+    def remove(self, rule_arn: str) -> None:
+        """Remove a deleted rule."""
+        self.rules[:] = [rule for rule in self.rules if rule.get('RuleArn') != rule_arn]
+        self.by_path = {}
+        for rule in self.rules:
+            self._index(rule)
+    
+    def set_actions(self, rule_arn: str, actions: List[Dict[str, Any]]) -> None:
+        """Record the new actions of a modified rule."""
+        for rule in self.rules:
+            if rule.get('RuleArn') == rule_arn:
+                rule['Actions'] = actions
+
 class ALBManager:
     """Manages AWS ALB resources for MCP services."""
 
@@ -25,14 +184,26 @@ class ALBManager:
         self.config_manager = config_manager
         self.compose_manager = compose_manager
         self.client = None
+        self.tagging_client = None
         self.target_groups = {}  # Maps server_id -> target group ARN
+        # boto3 clients are thread-safe, but our caches are shared between sync worker threads
+        self._target_groups_lock = threading.Lock()
+        self._rules_lock = threading.RLock()
+        # Values that are fixed for the lifetime of the process, resolved on first use
+        self._instance_id: Optional[str] = None
+        self._listener_arn: Optional[str] = None
+        self._vpc_id: Optional[str] = None
+        # Set once the tagging API denied access, so later syncs go straight to describe_tags
+        self._tagging_api_denied = False
         self._connect_aws()
     
     def _connect_aws(self) -> None:
         """Connect to AWS ELB service."""
         try:
             region = self.config_manager.get_setting("aws", "region", "us-west-2")
-            self.client = boto3.client('elbv2', region_name=region)
+            max_pool_connections = self.config_manager.get_setting("aws", "max_pool_connections", 50)
+            self.client = _get_shared_client('elbv2', region, max_pool_connections)
+            self.tagging_client = _get_shared_client('resourcegroupstaggingapi', region, max_pool_connections)
             logger.info(f"Connected to AWS ELB service in {region}")
         except Exception as e:
             logger.error(f"Failed to connect to AWS ELB service: {str(e)}")
@@ -48,8 +219,7 @@ class ALBManager:
             A target group name
         """
         # Replace non-alphanumeric characters with dashes and limit length to 32 chars
-        clean_id = ''.join(c if c.isalnum() else '-' for c in server_id)
-        return f"tg-mcp-{clean_id}"[:32]
+        return f"tg-mcp-{server_id.translate(_TARGET_GROUP_NAME_TABLE)}"[:32]
     
     def _get_listener_arn(self) -> str:
         """Get the ALB listener ARN from configuration.
@@ -57,10 +227,12 @@ class ALBManager:
         Returns:
             ALB listener ARN
         """
-        listener_arn = self.config_manager.get_setting("aws", "listener_arn", "")
-        if not listener_arn:
-            raise ValueError("Missing required configuration: aws.listener_arn")
-        return listener_arn
+        if self._listener_arn is None:
+            listener_arn = self.config_manager.get_setting("aws", "listener_arn", "")
+            if not listener_arn:
+                raise ValueError("Missing required configuration: aws.listener_arn")
+            self._listener_arn = listener_arn
+        return self._listener_arn
     
     def _get_vpc_id(self) -> str:
         """Get the VPC ID from configuration.
@@ -68,10 +240,12 @@ class ALBManager:
         Returns:
             VPC ID
         """
-        vpc_id = self.config_manager.get_setting("aws", "vpc_id", "")
-        if not vpc_id:
-            raise ValueError("Missing required configuration: aws.vpc_id")
-        return vpc_id
+        if self._vpc_id is None:
+            vpc_id = self.config_manager.get_setting("aws", "vpc_id", "")
+            if not vpc_id:
+                raise ValueError("Missing required configuration: aws.vpc_id")
+            self._vpc_id = vpc_id
+        return self._vpc_id
     
     def _get_path_pattern(self, server_id: str) -> str:
         """Generate the path pattern for a server ID.
@@ -84,15 +258,24 @@ class ALBManager:
         """
         return f"/mcp/{server_id}/*"
     
-    def _target_group_exists(self, target_group_name: str) -> Optional[str]:
+    def _target_group_exists(self, target_group_name: str, use_cache: bool = True) -> Optional[str]:
         """Check if a target group with the given name exists.
         
         Args:
             target_group_name: Name of the target group to check
+            use_cache: Answer from the known target groups before asking AWS
             
         Returns:
             Target group ARN if it exists, None otherwise
         """
+        if use_cache:
+            with self._target_groups_lock:
+                known_arns = list(self.target_groups.values())
+            for arn in known_arns:
+                # ARNs have the form arn:aws:elasticloadbalancing:...:targetgroup/<name>/<id>
+                if arn.rsplit(':', 1)[-1].split('/')[1:2] == [target_group_name]:
+                    return arn
+        
         try:
             response = self.client.describe_target_groups(Names=[target_group_name])
             if response.get('TargetGroups') and len(response['TargetGroups']) > 0:
@@ -104,20 +287,125 @@ class ALBManager:
             logger.error(f"Error checking target group existence: {str(e)}")
             raise
     
-    def _rule_exists_for_path(self, path_pattern: str) -> Optional[Dict[str, Any]]:
+    def _describe_tags(self, resource_arns: List[str]) -> Dict[str, Dict[str, str]]:
+        """Get the tags for a list of resources using as few API calls as possible.
+        
+        Args:
+            resource_arns: ARNs of the resources to describe
+            
+        Returns:
+            Dictionary mapping resource ARN -> {tag key: tag value}
+        """
+        tags_by_arn = {}
+        for i in range(0, len(resource_arns), DESCRIBE_TAGS_BATCH_SIZE):
+            response = self.client.describe_tags(
+                ResourceArns=resource_arns[i:i + DESCRIBE_TAGS_BATCH_SIZE]
+            )
+            for tag_description in response.get('TagDescriptions', []):
+                tags_by_arn[tag_description['ResourceArn']] = {
+                    tag.get('Key'): tag.get('Value') for tag in tag_description.get('Tags', [])
+                }
+        return tags_by_arn
+    
+    def _get_managed_target_groups(self) -> Dict[str, Dict[str, str]]:
+        """Get all target groups managed by the orchestrator.
+        
+        Uses the Resource Groups Tagging API so that only MCP target groups are
+        listed. Falls back to describing every target group and batching the tag
+        lookups if the tagging API is not available (e.g. missing permissions).
+        Access denied is permanent, so the fallback is then used from the start.
+        
+        Returns:
+            Dictionary mapping target group ARN -> {tag key: tag value}
+        """
+        if not self._tagging_api_denied:
+            try:
+                paginator = self.tagging_client.get_paginator('get_resources')
+                managed = {}
+                for page in paginator.paginate(
+                    TagFilters=[{'Key': 'ManagedBy', 'Values': ['mcp-orchestrator']}],
+                    ResourceTypeFilters=['elasticloadbalancing:targetgroup']
+                ):
+                    for resource in page.get('ResourceTagMappingList', []):
+                        managed[resource['ResourceARN']] = {
+                            tag.get('Key'): tag.get('Value') for tag in resource.get('Tags', [])
+                        }
+                return managed
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') in ACCESS_DENIED_ERROR_CODES:
+                    self._tagging_api_denied = True
+                    logger.warning(f"Tagging API access denied, using describe_tags from now on: {str(e)}")
+                else:
+                    logger.warning(f"Tagging API unavailable, falling back to describe_tags: {str(e)}")
+        
+        paginator = self.client.get_paginator('describe_target_groups')
+        target_group_arns = [
+            tg['TargetGroupArn']
+            for page in paginator.paginate()
+            for tg in page.get('TargetGroups', [])
+        ]
+        tags_by_arn = self._describe_tags(target_group_arns)
+        return {
+            arn: tags for arn, tags in tags_by_arn.items()
+            if tags.get('ManagedBy') == 'mcp-orchestrator'
+        }
+    
+    def _get_rules(self) -> _ListenerRules:
+        """List all rules on the ALB listener.
+        
+        sync_alb lists the rules once and passes them to the calls it makes.
+        
+        Returns:
+            Listener rules indexed by path pattern
+        """
+        listener_arn = self._get_listener_arn()
+        paginator = self.client.get_paginator('describe_rules')
+        rules = []
+        for page in paginator.paginate(ListenerArn=listener_arn):
+            rules.extend(page.get('Rules', []))
+        return _ListenerRules(rules)
+    
+    def _iter_rules(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the listener rules, page by page.
+        
+        Pages are fetched lazily, so callers that stop early do not list the
+        whole listener.
+        
+        Yields:
+            Listener rules
+        """
+        paginator = self.client.get_paginator('describe_rules')
+        for page in paginator.paginate(ListenerArn=self._get_listener_arn()):
+            yield from page.get('Rules', [])
+    
+    def _rule_exists_for_path(self, path_pattern: str,
+                              rules: Optional[Iterable[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
         """Check if a rule exists for the given path pattern.
         
         Args:
             path_pattern: Path pattern to check
+            rules: Pre-fetched listener rules, fetched from AWS if not given
             
         Returns:
             Rule details if it exists, None otherwise
         """
         try:
-            listener_arn = self._get_listener_arn()
-            response = self.client.describe_rules(ListenerArn=listener_arn)
+            # Look the path up in the index when checking against the rules listed by a sync
+            if isinstance(rules, _ListenerRules):
+                rule = rules.by_path.get(path_pattern)
+                if rule is None:
+                    return None
+                return {
+                    'RuleArn': rule['RuleArn'],
+                    'Priority': rule['Priority'],
+                    'Actions': rule['Actions']
+                }
+            
+            if rules is None:
+                rules = self._iter_rules()
             
-            for rule in response.get('Rules', []):
+            # Return on the first match so that lazily fetched pages stop early
+            for rule in rules:
                 for condition in rule.get('Conditions', []):
                     if condition.get('Field') == 'path-pattern':
                         for value in condition.get('Values', []):
@@ -132,38 +420,56 @@ class ALBManager:
             logger.error(f"Error checking rule existence: {str(e)}")
             raise
     
-    def _get_next_available_priority(self) -> int:
+    def _rule_points_to(self, actions: List[Dict[str, Any]], target_group_arn: str) -> bool:
+        """Check if a rule's actions already forward to the given target group.
+        
+        Forward actions can name the target group directly or, for weighted
+        forwards, only list it under ForwardConfig.
+        
+        Args:
+            actions: Actions of the listener rule
+            target_group_arn: ARN of the target group the rule should forward to
+            
+        Returns:
+            True if the rule forwards to the target group, False otherwise
+        """
+        for action in actions:
+            if action.get('Type') != 'forward':
+                continue
+            if action.get('TargetGroupArn') == target_group_arn:
+                return True
+            forward_config = action.get('ForwardConfig', {})
+            if any(tg.get('TargetGroupArn') == target_group_arn
+                   for tg in forward_config.get('TargetGroups', [])):
+                return True
+        return False
+    
+    def _get_next_available_priority(self, rules: Optional[Iterable[Dict[str, Any]]] = None) -> int:
         """Get the next available rule priority.
         
+        Args:
+            rules: Pre-fetched listener rules, fetched from AWS if not given
+            
         Returns:
             Next available priority
         """
         try:
-            listener_arn = self._get_listener_arn()
-            response = self.client.describe_rules(ListenerArn=listener_arn)
-            
-            priorities = []
-            for rule in response.get('Rules', []):
-                # Skip default rule (priority is "default")
-                if rule['Priority'] != 'default':
-                    priorities.append(int(rule['Priority']))
+            if rules is None:
+                rules = self._iter_rules()
             
-            if not priorities:
-                return 1
+            # Skip default rule (priority is "default")
+            priorities = {int(rule['Priority']) for rule in rules if rule['Priority'] != 'default'}
             
             # Find the first available priority
-            priorities.sort()
-            for i in range(1, priorities[-1] + 2):
-                if i not in priorities:
-                    return i
-            
-            return priorities[-1] + 1
+            priority = 1
+            while priority in priorities:
+                priority += 1
+            return priority
         except ClientError as e:
             logger.error(f"Error getting next available priority: {str(e)}")
             # Fallback to a high priority
             return 1000
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     def create_target_group(self, server_id: str) -> Optional[str]:
         """Create a target group for an MCP server.
         
@@ -173,6 +479,19 @@ class ALBManager:
         Returns:
             Target group ARN if successful, None otherwise
         """
+        return self._create_target_group(server_id)[0]
+    
+    @aws_retry
+    def _create_target_group(self, server_id: str) -> Tuple[Optional[str], Optional[int]]:
+        """Create a target group for an MCP server, returning the port it looked up.
+        
+        Args:
+            server_id: The MCP server ID
+            
+        Returns:
+            Tuple of the target group ARN, None on failure, and the server's port,
+            None if the target group already existed
+        """
         try:
             target_group_name = self._get_target_group_name(server_id)
             
@@ -180,14 +499,15 @@ class ALBManager:
             existing_arn = self._target_group_exists(target_group_name)
             if existing_arn:
                 logger.info(f"Target group {target_group_name} already exists")
-                self.target_groups[server_id] = existing_arn
-                return existing_arn
+                with self._target_groups_lock:
+                    self.target_groups[server_id] = existing_arn
+                return existing_arn, None
             
             # Get port for server
             port = self.compose_manager.get_port_for_server(server_id)
             if not port:
                 logger.error(f"No port found for server {server_id}")
-                return None
+                return None, None
             
             # Create target group
             response = self.client.create_target_group(
@@ -201,40 +521,39 @@ class ALBManager:
                 HealthCheckTimeoutSeconds=5,
                 HealthyThresholdCount=2,
                 UnhealthyThresholdCount=2,
-                Matcher={'HttpCode': '200-299'}
+                Matcher={'HttpCode': '200-299'},
+                Tags=[
+                    {'Key': 'Name', 'Value': target_group_name},
+                    {'Key': 'ManagedBy', 'Value': 'mcp-orchestrator'},
+                    {'Key': 'MCPService', 'Value': server_id}
+                ]
             )
             
             if not response.get('TargetGroups') or len(response['TargetGroups']) == 0:
                 logger.error(f"Failed to create target group for {server_id}")
-                return None
+                return None, None
             
             target_group_arn = response['TargetGroups'][0]['TargetGroupArn']
             logger.info(f"Created target group {target_group_name} with ARN {target_group_arn}")
             
             # Store target group ARN
-            self.target_groups[server_id] = target_group_arn
-            
-            # Add tags
-            self.client.add_tags(
-                ResourceArns=[target_group_arn],
-                Tags=[
-                    {'Key': 'Name', 'Value': target_group_name},
-                    {'Key': 'ManagedBy', 'Value': 'mcp-orchestrator'},
-                    {'Key': 'MCPService', 'Value': server_id}
-                ]
-            )
+            with self._target_groups_lock:
+                self.target_groups[server_id] = target_group_arn
             
-            return target_group_arn
+            return target_group_arn, port
         except Exception as e:
+            if _is_retryable(e):
+                raise
             logger.error(f"Failed to create target group for {server_id}: {str(e)}")
-            return None
+            return None, None
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def register_target(self, server_id: str) -> bool:
+    @aws_retry
+    def register_target(self, server_id: str, port: Optional[int] = None) -> bool:
         """Register the EC2 instance as a target in the target group.
         
         Args:
             server_id: The MCP server ID
+            port: The server's port if it was just looked up, looked up again if not given
             
         Returns:
             True if successful, False otherwise
@@ -243,13 +562,15 @@ class ALBManager:
             # Get target group ARN
             target_group_arn = self.target_groups.get(server_id)
             if not target_group_arn:
-                target_group_arn = self.create_target_group(server_id)
+                target_group_arn, created_port = self._create_target_group(server_id)
                 if not target_group_arn:
                     logger.error(f"No target group found for server {server_id}")
                     return False
+                port = port or created_port
             
-            # Get port for server
-            port = self.compose_manager.get_port_for_server(server_id)
+            # Get port for server unless it was just looked up
+            if not port:
+                port = self.compose_manager.get_port_for_server(server_id)
             if not port:
                 logger.error(f"No port found for server {server_id}")
                 return False
@@ -274,36 +595,65 @@ class ALBManager:
             logger.info(f"Registered instance {instance_id}:{port} with target group for {server_id}")
             return True
         except Exception as e:
+            if _is_retryable(e):
+                raise
             logger.error(f"Failed to register target for {server_id}: {str(e)}")
             return False
     
     def _get_instance_id(self) -> Optional[str]:
         """Get the EC2 instance ID of the current instance.
         
+        An instance ID returned by the metadata service is cached for the lifetime of
+        the manager. The dummy ID is not, so the metadata service is asked again later.
+        
         Returns:
-            Instance ID if running on EC2, None otherwise
+            Instance ID if running on EC2, a dummy instance ID otherwise
+        """
+        if self._instance_id is None:
+            instance_id = self._fetch_instance_id()
+            if instance_id is None:
+                return DUMMY_INSTANCE_ID
+            self._instance_id = instance_id
+        return self._instance_id
+    
+    def _fetch_instance_id(self) -> Optional[str]:
+        """Query the EC2 metadata service for the instance ID.
+        
+        Returns:
+            Instance ID if running on EC2, None if the metadata service didn't return one
         """
         try:
-            # Try to get instance ID from EC2 metadata service
-            import requests
-            response = requests.get('http://169.254.169.254/latest/meta-data/instance-id', timeout=2)
+            # Try to get instance ID from EC2 metadata service, using an IMDSv2 session token
+            session = _get_imds_session()
+            headers = {}
+            token_response = session.put(
+                IMDS_TOKEN_URL,
+                headers={'X-aws-ec2-metadata-token-ttl-seconds': '21600'},
+                timeout=2
+            )
+            if token_response.status_code == 200:
+                headers['X-aws-ec2-metadata-token'] = token_response.text
+            
+            response = session.get(IMDS_INSTANCE_ID_URL, headers=headers, timeout=2)
             if response.status_code == 200:
                 return response.text
             
-            # If not running on EC2, use a dummy instance ID for testing
+            # If not running on EC2, _get_instance_id falls back to a dummy instance ID
             logger.warning("Not running on EC2, using dummy instance ID")
-            return "i-dummy"
+            return None
         except Exception as e:
             logger.error(f"Failed to get EC2 instance ID: {str(e)}")
-            # Use dummy instance ID as fallback
-            return "i-dummy"
+            # _get_instance_id uses the dummy instance ID as fallback
+            return None
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def create_listener_rule(self, server_id: str) -> Optional[str]:
+    @aws_retry
+    def create_listener_rule(self, server_id: str,
+                             rules: Optional[Iterable[Dict[str, Any]]] = None) -> Optional[str]:
         """Create a listener rule for an MCP server.
         
         Args:
             server_id: The MCP server ID
+            rules: Pre-fetched listener rules, fetched from AWS if not given
             
         Returns:
             Rule ARN if successful, None otherwise
@@ -320,20 +670,49 @@ class ALBManager:
             # Get path pattern
             path_pattern = self._get_path_pattern(server_id)
             
-            # Check if rule already exists
-            existing_rule = self._rule_exists_for_path(path_pattern)
-            if existing_rule:
-                logger.info(f"Rule already exists for path {path_pattern}")
-                
-                # Check if the rule points to the correct target group
-                for action in existing_rule.get('Actions', []):
-                    if action.get('Type') == 'forward' and action.get('TargetGroupArn') == target_group_arn:
+            # Rule lookup, priority allocation and creation must not interleave between threads
+            with self._rules_lock:
+                # Check if rule already exists
+                existing_rule = self._rule_exists_for_path(path_pattern, rules)
+                if existing_rule:
+                    logger.info(f"Rule already exists for path {path_pattern}")
+                    
+                    # Check if the rule points to the correct target group
+                    if self._rule_points_to(existing_rule.get('Actions', []), target_group_arn):
                         # Rule already points to the correct target group
                         return existing_rule['RuleArn']
+                    
+                    # Update rule to point to the correct target group
+                    self.client.modify_rule(
+                        RuleArn=existing_rule['RuleArn'],
+                        Actions=[
+                            {
+                                'Type': 'forward',
+                                'TargetGroupArn': target_group_arn
+                            }
+                        ]
+                    )
+                    # Keep the rules listed by the sync in sync with AWS
+                    if isinstance(rules, _ListenerRules):
+                        rules.set_actions(existing_rule['RuleArn'],
+                                          [{'Type': 'forward', 'TargetGroupArn': target_group_arn}])
+                    
+                    logger.info(f"Updated rule for path {path_pattern} to point to target group for {server_id}")
+                    return existing_rule['RuleArn']
+                
+                # Get listener ARN
+                listener_arn = self._get_listener_arn()
                 
-                # Update rule to point to the correct target group
-                self.client.modify_rule(
-                    RuleArn=existing_rule['RuleArn'],
+                # Create rule
+                response = self.client.create_rule(
+                    ListenerArn=listener_arn,
+                    Priority=self._get_next_available_priority(rules),
+                    Conditions=[
+                        {
+                            'Field': 'path-pattern',
+                            'Values': [path_pattern]
+                        }
+                    ],
                     Actions=[
                         {
                             'Type': 'forward',
@@ -342,39 +721,19 @@ class ALBManager:
                     ]
                 )
                 
-                logger.info(f"Updated rule for path {path_pattern} to point to target group for {server_id}")
-                return existing_rule['RuleArn']
-            
-            # Get listener ARN
-            listener_arn = self._get_listener_arn()
-            
-            # Create rule
-            response = self.client.create_rule(
-                ListenerArn=listener_arn,
-                Priority=self._get_next_available_priority(),
-                Conditions=[
-                    {
-                        'Field': 'path-pattern',
-                        'Values': [path_pattern]
-                    }
-                ],
-                Actions=[
-                    {
-                        'Type': 'forward',
-                        'TargetGroupArn': target_group_arn
-                    }
-                ]
-            )
-            
-            if not response.get('Rules') or len(response['Rules']) == 0:
-                logger.error(f"Failed to create listener rule for {server_id}")
-                return None
-            
-            rule_arn = response['Rules'][0]['RuleArn']
-            logger.info(f"Created listener rule for path {path_pattern} with ARN {rule_arn}")
-            
-            return rule_arn
+                if not response.get('Rules') or len(response['Rules']) == 0:
+                    logger.error(f"Failed to create listener rule for {server_id}")
+                    return None
+                
+                rule_arn = response['Rules'][0]['RuleArn']
+                if isinstance(rules, _ListenerRules):
+                    rules.add(response['Rules'][0])
+                logger.info(f"Created listener rule for path {path_pattern} with ARN {rule_arn}")
+                
+                return rule_arn
         except Exception as e:
+            if _is_retryable(e):
+                raise
             logger.error(f"Failed to create listener rule for {server_id}: {str(e)}")
             return None
     
@@ -391,16 +750,17 @@ class ALBManager:
             # Get path pattern
             path_pattern = self._get_path_pattern(server_id)
             
-            # Check if rule exists
-            existing_rule = self._rule_exists_for_path(path_pattern)
-            if not existing_rule:
-                logger.info(f"No rule found for path {path_pattern}")
-                return True
-            
-            # Delete rule
-            self.client.delete_rule(
-                RuleArn=existing_rule['RuleArn']
-            )
+            with self._rules_lock:
+                # Check if rule exists
+                existing_rule = self._rule_exists_for_path(path_pattern)
+                if not existing_rule:
+                    logger.info(f"No rule found for path {path_pattern}")
+                    return True
+                
+                # Delete rule
+                self.client.delete_rule(
+                    RuleArn=existing_rule['RuleArn']
+                )
             
             logger.info(f"Deleted listener rule for path {path_pattern}")
             return True
@@ -408,11 +768,28 @@ class ALBManager:
             logger.error(f"Failed to delete listener rule for {server_id}: {str(e)}")
             return False
     
-    def delete_target_group_for_server(self, server_id: str) -> bool:
+    def _delete_target_group_by_arn(self, target_group_arn: str, server_id: str) -> None:
+        """Delete a target group whose ARN is already known.
+        
+        Args:
+            target_group_arn: ARN of the target group to delete
+            server_id: The MCP server ID the target group belongs to
+        """
+        self.client.delete_target_group(
+            TargetGroupArn=target_group_arn
+        )
+        
+        # Remove from cache
+        with self._target_groups_lock:
+            self.target_groups.pop(server_id, None)
+    
+    def delete_target_group_for_server(self, server_id: str,
+                                       target_group_arn: Optional[str] = None) -> bool:
         """Delete the target group for an MCP server.
         
         Args:
             server_id: The MCP server ID
+            target_group_arn: ARN of the target group if already known, looked up otherwise
             
         Returns:
             True if successful, False otherwise
@@ -420,20 +797,18 @@ class ALBManager:
         try:
             target_group_name = self._get_target_group_name(server_id)
             
+            if not target_group_arn:
+                target_group_arn = self.target_groups.get(server_id)
+            
             # Check if target group exists
-            target_group_arn = self._target_group_exists(target_group_name)
+            if not target_group_arn:
+                target_group_arn = self._target_group_exists(target_group_name)
             if not target_group_arn:
                 logger.info(f"Target group {target_group_name} does not exist")
                 return True
             
             # Delete target group
-            self.client.delete_target_group(
-                TargetGroupArn=target_group_arn
-            )
-            
-            # Remove from cache
-            if server_id in self.target_groups:
-                del self.target_groups[server_id]
+            self._delete_target_group_by_arn(target_group_arn, server_id)
             
             logger.info(f"Deleted target group {target_group_name}")
             return True
@@ -441,11 +816,13 @@ class ALBManager:
             logger.error(f"Failed to delete target group for {server_id}: {str(e)}")
             return False
     
-    def setup_alb_for_server(self, server_id: str) -> Dict[str, Any]:
+    def setup_alb_for_server(self, server_id: str,
+                             rules: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Set up ALB resources for an MCP server.
         
         Args:
             server_id: The MCP server ID
+            rules: Pre-fetched listener rules, fetched from AWS if not given
             
         Returns:
             Dictionary with setup results
@@ -459,22 +836,22 @@ class ALBManager:
         
         try:
             # Create target group
-            target_group_arn = self.create_target_group(server_id)
+            target_group_arn, port = self._create_target_group(server_id)
             if not target_group_arn:
                 results["errors"].append("Failed to create target group")
                 return results
             
             results["target_group_created"] = True
             
-            # Register target
-            if not self.register_target(server_id):
+            # Register target, reusing the port found while creating the target group
+            if not self.register_target(server_id, port):
                 results["errors"].append("Failed to register target")
                 return results
             
             results["target_registered"] = True
             
             # Create listener rule
-            rule_arn = self.create_listener_rule(server_id)
+            rule_arn = self.create_listener_rule(server_id, rules)
             if not rule_arn:
                 results["errors"].append("Failed to create listener rule")
                 return results
@@ -488,11 +865,13 @@ class ALBManager:
             results["errors"].append(str(e))
             return results
     
-    def cleanup_alb_for_server(self, server_id: str) -> Dict[str, Any]:
+    def cleanup_alb_for_server(self, server_id: str,
+                               target_group_arn: Optional[str] = None) -> Dict[str, Any]:
         """Clean up ALB resources for an MCP server.
         
         Args:
             server_id: The MCP server ID
+            target_group_arn: ARN of the server's target group if already known
             
         Returns:
             Dictionary with cleanup results
@@ -511,7 +890,7 @@ class ALBManager:
                 results["errors"].append("Failed to delete listener rule")
             
             # Delete target group
-            if self.delete_target_group_for_server(server_id):
+            if self.delete_target_group_for_server(server_id, target_group_arn):
                 results["target_group_deleted"] = True
             else:
                 results["errors"].append("Failed to delete target group")
@@ -523,6 +902,50 @@ class ALBManager:
             results["errors"].append(str(e))
             return results
     
+    def _cleanup_known(self, server_id: str, rule_arn: Optional[str],
+                       target_group_arn: Optional[str], rules: _ListenerRules) -> Dict[str, Any]:
+        """Clean up ALB resources for an MCP server whose ARNs are already known.
+        
+        Unlike cleanup_alb_for_server, no lookups are made: only the given
+        resources are deleted.
+        
+        Args:
+            server_id: The MCP server ID
+            rule_arn: ARN of the server's listener rule, None if it has none
+            target_group_arn: ARN of the server's target group, None if it has none
+            rules: Listener rules listed by the sync, the deleted rule is removed from them
+            
+        Returns:
+            Dictionary with cleanup results
+        """
+        results = {
+            "rule_deleted": False,
+            "target_group_deleted": False,
+            "errors": []
+        }
+        
+        try:
+            if rule_arn:
+                with self._rules_lock:
+                    self.client.delete_rule(RuleArn=rule_arn)
+                    rules.remove(rule_arn)
+                logger.info(f"Deleted listener rule for {server_id}")
+            results["rule_deleted"] = True
+        except Exception as e:
+            logger.error(f"Failed to delete listener rule for {server_id}: {str(e)}")
+            results["errors"].append("Failed to delete listener rule")
+        
+        try:
+            if target_group_arn:
+                self._delete_target_group_by_arn(target_group_arn, server_id)
+                logger.info(f"Deleted target group for {server_id}")
+            results["target_group_deleted"] = True
+        except Exception as e:
+            logger.error(f"Failed to delete target group for {server_id}: {str(e)}")
+            results["errors"].append("Failed to delete target group")
+        
+        return results
+    
     def sync_alb(self) -> Dict[str, Any]:
         """Synchronize ALB resources with the MCP server configuration.
         
@@ -540,12 +963,43 @@ class ALBManager:
             # Get MCP server configurations
             mcp_servers = self.config_manager.get_mcp_servers()
             
-            # Set up ALB resources for each MCP server
+            # Fetch listener rules once for the whole sync pass
+            try:
+                rules = self._get_rules()
+            except Exception as e:
+                logger.error(f"Failed to list listener rules: {str(e)}")
+                rules = None
+            
+            # Refresh the known target groups from AWS in one pass
+            try:
+                managed_target_groups = self._get_managed_target_groups()
+                with self._target_groups_lock:
+                    self.target_groups = {
+                        tags['MCPService']: arn for arn, tags in managed_target_groups.items()
+                        if tags.get('MCPService')
+                    }
+            except Exception as e:
+                logger.error(f"Failed to list managed target groups: {str(e)}")
+                managed_target_groups = None
+            
+            # Work out which servers need their ALB resources set up or cleaned up
+            to_setup = []
+            to_cleanup = []
+            known_cleanup = {}  # Maps server_id -> (rule ARN, target group ARN)
+            disabled = []
             for server_id, config in mcp_servers.items():
                 if config.get("disabled", False):
-                    # Server is disabled, clean up ALB resources
-                    self.cleanup_alb_for_server(server_id)
-                    results["deleted"].append(server_id)
+                    disabled.append(server_id)
+                    # Server is disabled, clean up ALB resources.
+                    # With fresh listings there is nothing to look up: skip servers
+                    # that have no resources left and delete the rest by ARN.
+                    if rules is not None and managed_target_groups is not None:
+                        rule = rules.by_path.get(self._get_path_pattern(server_id))
+                        target_group_arn = self.target_groups.get(server_id)
+                        if rule is not None or target_group_arn is not None:
+                            known_cleanup[server_id] = (rule['RuleArn'] if rule else None, target_group_arn)
+                        continue
+                    to_cleanup.append(server_id)
                     continue
                 
                 # Get service info
@@ -556,41 +1010,47 @@ class ALBManager:
                     logger.info(f"Service for {server_id} doesn't exist or isn't running, skipping ALB setup")
                     continue
                 
-                # Set up ALB resources
-                setup_results = self.setup_alb_for_server(server_id)
-                if setup_results.get("errors"):
-                    results["errors"].extend(f"{server_id}: {error}" for error in setup_results["errors"])
-                else:
-                    if setup_results.get("target_group_created") and setup_results.get("rule_created"):
-                        results["created"].append(server_id)
-                    else:
-                        results["updated"].append(server_id)
-            
-            # Get all target groups
-            response = self.client.describe_target_groups()
+                to_setup.append(server_id)
             
-            # Find and clean up orphaned target groups
-            for target_group in response.get('TargetGroups', []):
-                tags_response = self.client.describe_tags(
-                    ResourceArns=[target_group['TargetGroupArn']]
-                )
+            with ThreadPoolExecutor(max_workers=SYNC_MAX_WORKERS) as executor:
+                cleanup_futures = [executor.submit(self.cleanup_alb_for_server, server_id)
+                                   for server_id in to_cleanup]
+                cleanup_futures.extend(executor.submit(self._cleanup_known, server_id, rule_arn, target_group_arn, rules)
+                                       for server_id, (rule_arn, target_group_arn) in known_cleanup.items())
+                setup_futures = {executor.submit(self.setup_alb_for_server, server_id, rules): server_id
+                                 for server_id in to_setup}
+                
+                # Set up ALB resources for each running MCP server
+                for future in as_completed(setup_futures):
+                    server_id = setup_futures[future]
+                    setup_results = future.result()
+                    if setup_results.get("errors"):
+                        results["errors"].extend(f"{server_id}: {error}" for error in setup_results["errors"])
+                    else:
+                        if setup_results.get("target_group_created") and setup_results.get("rule_created"):
+                            results["created"].append(server_id)
+                        else:
+                            results["updated"].append(server_id)
                 
-                # Check if this is an MCP target group
-                is_mcp_target_group = False
-                server_id = None
+                for future in as_completed(cleanup_futures):
+                    future.result()
+                # Disabled servers are reported whether or not they had resources left
+                results["deleted"].extend(disabled)
                 
-                for tag_description in tags_response.get('TagDescriptions', []):
-                    for tag in tag_description.get('Tags', []):
-                        if tag.get('Key') == 'ManagedBy' and tag.get('Value') == 'mcp-orchestrator':
-                            is_mcp_target_group = True
-                        if tag.get('Key') == 'MCPService':
-                            server_id = tag.get('Value')
+                # Find and clean up orphaned target groups
+                orphans = {}
+                for target_group_arn, tags in (managed_target_groups or {}).items():
+                    server_id = tags.get('MCPService')
+                    
+                    if server_id and server_id not in mcp_servers:
+                        # This is an orphaned target group, clean it up
+                        logger.info(f"Found orphaned target group for {server_id}, cleaning up")
+                        orphans[server_id] = target_group_arn
                 
-                if is_mcp_target_group and server_id and server_id not in mcp_servers:
-                    # This is an orphaned target group, clean it up
-                    logger.info(f"Found orphaned target group for {server_id}, cleaning up")
-                    self.cleanup_alb_for_server(server_id)
-                    results["deleted"].append(server_id)
+                for future in as_completed([executor.submit(self.cleanup_alb_for_server, server_id, target_group_arn)
+                                            for server_id, target_group_arn in orphans.items()]):
+                    future.result()
+                results["deleted"].extend(orphans)
             
             logger.info(f"ALB sync complete: {len(results['created'])} created, {len(results['updated'])} updated, {len(results['deleted'])} deleted")
             return results
@@ -2,11 +2,11 @@
 
 import os
 import subprocess
-import yaml
-import re
-import tempfile
+import json
 import time
-from typing import Dict, Any, List, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
 
 from orchestrator.utils.logging import setup_logging
 from orchestrator.config_manager import ConfigManager
@@ -14,6 +14,18 @@ from orchestrator.config_manager import ConfigManager
 # Set up logger
 logger = setup_logging(__name__)
 
+# Number of services restarted or stopped concurrently during a sync
+SYNC_MAX_WORKERS = 8
+
+# (use legacy docker-compose, simple Compose V2 commands) detected by the first ComposeManager
+_COMPOSE_FLAVOR: Optional[Tuple[bool, bool]] = None
+
+# How long docker inspect and docker compose ps results are reused, in seconds
+STATE_CACHE_TTL = 2.0
+
+# How long they are reused while docker events are followed, in case an event is missed
+EVENTS_CACHE_TTL = 60.0
+
 class ComposeManager:
     """Manages Docker Compose for MCP services."""
 
@@ -26,12 +38,46 @@ class ComposeManager:
         self.config_manager = config_manager
         self.compose_path = config_manager.compose_path
         self.port_allocations = {}  # Maps server_id -> host_port
+        self._port_allocations_lock = threading.Lock()  # Services are synced from several threads
         self._use_legacy_compose = False  # Flag to indicate whether to use docker-compose or docker compose
         self._simple_compose_v2 = False   # Flag for Docker Compose V2 without --project-directory support
+        # Short-lived caches of container state, so repeated lookups don't each run docker
+        self._inspect_ttl = STATE_CACHE_TTL
+        self._inspect_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}  # Maps service_id -> (time, inspect data)
+        self._running_services_cache: Optional[Tuple[float, Set[str]]] = None
+        self._service_state_cache: Dict[str, Dict[str, Any]] = {}  # Service info reported by docker compose ps
+        # While docker events are being followed, the caches are invalidated by events instead of expiring
+        self._event_thread: Optional[threading.Thread] = None
+        self._events_active = False
+        # Docker Engine API client for reading container state, False if unavailable
+        self._docker_client = None
+        self._docker_client_lock = threading.Lock()
         self._check_docker_compose()
         
+        # Invariants of the compose file location, used to build every command
+        self._compose_dir = os.path.dirname(os.path.abspath(self.compose_path))
+        self._project_dir_name = os.path.basename(self._compose_dir)
+        if self._use_legacy_compose:
+            self._compose_cmd = ["docker-compose", "-f", self.compose_path]
+        else:
+            # Modern docker compose is run from the compose file's directory
+            self._compose_cmd = ["docker", "compose", "-f", os.path.basename(self.compose_path)]
+        
     def _check_docker_compose(self) -> None:
-        """Check if docker compose is installed and determine feature support."""
+        """Check if docker compose is installed and determine feature support.
+        
+        The installed tools don't change while the orchestrator runs, so the probe
+        runs once per process and later managers reuse its result.
+        """
+        global _COMPOSE_FLAVOR
+        if _COMPOSE_FLAVOR is None:
+            self._detect_docker_compose()
+            _COMPOSE_FLAVOR = (self._use_legacy_compose, self._simple_compose_v2)
+        else:
+            self._use_legacy_compose, self._simple_compose_v2 = _COMPOSE_FLAVOR
+    
+    def _detect_docker_compose(self) -> None:
+        """Probe which docker compose command is available."""
         # First try classic docker-compose as it seems more compatible on this server
         try:
             # Try classic docker-compose first
@@ -90,6 +136,25 @@ class ComposeManager:
         logger.error(error_message)
         raise RuntimeError(error_message)
     
+    def _run_compose(self, description: str, *args: str) -> subprocess.CompletedProcess:
+        """Run a docker compose command against the compose file.
+        
+        Args:
+            description: What the command does, for logging
+            *args: Arguments following the compose file option
+            
+        Returns:
+            The completed process
+        """
+        cmd = [*self._compose_cmd, *args]
+        if self._use_legacy_compose:
+            logger.info(f"{description} (legacy): {' '.join(cmd)}")
+            return subprocess.run(cmd, capture_output=True, text=True, check=False)
+        
+        # Run from the compose file's directory without changing our own working directory
+        logger.info(f"{description} (modern): {' '.join(cmd)}")
+        return subprocess.run(cmd, capture_output=True, text=True, check=False, cwd=self._compose_dir)
+    
     def _service_exists(self, service_id: str) -> bool:
         """Check if a service exists in docker-compose.
         
@@ -99,39 +164,7 @@ class ComposeManager:
         Returns:
             True if service exists and is running, False otherwise
         """
-        try:
-            # Use docker compose ps to check if service is running
-            if self._use_legacy_compose:
-                cmd = ["docker-compose", "-f", self.compose_path, "ps", "--services"]
-                logger.info(f"Checking service existence (legacy): {' '.join(cmd)}")
-            else:
-                # When using modern docker compose, change to the directory first
-                old_cwd = os.getcwd()
-                file_name = os.path.basename(self.compose_path)
-                try:
-                    os.chdir(os.path.dirname(os.path.abspath(self.compose_path)))
-                    cmd = ["docker", "compose", "-f", file_name, "ps", "--services"]
-                    logger.info(f"Checking service existence (modern): {' '.join(cmd)}")
-                except Exception as e:
-                    logger.error(f"Failed to change directory: {str(e)}")
-                    os.chdir(old_cwd)
-                    return False
-                    
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            
-            # Restore the original working directory if changed
-            if not self._use_legacy_compose:
-                os.chdir(old_cwd)
-                
-            if result.returncode != 0:
-                logger.error(f"Command failed with return code {result.returncode}: {result.stderr}")
-                return False
-            
-            # If service is in the list, it exists
-            return service_id in result.stdout.strip().split('\n')
-        except Exception as e:
-            logger.error(f"Error checking service existence: {str(e)}")
-            return False
+        return service_id in self._get_running_service_set()
             
     def _update_port_for_server(self, service_id: str) -> Optional[int]:
         """Get and store the host port for a service.
@@ -143,23 +176,12 @@ class ComposeManager:
             Host port if found, None otherwise
         """
         try:
-            # Get current directory name for the docker-compose project name
-            dir_name = os.path.basename(os.path.dirname(os.path.abspath(self.compose_path)))
-            container_name = f"{dir_name}-{service_id}-1"
-            
-            # Use docker inspect to get port mappings
-            result = subprocess.run(
-                ["docker", "inspect", "--format", 
-                 "{{range $p, $conf := .NetworkSettings.Ports}}{{(index $conf 0).HostPort}}{{end}}", 
-                 container_name],
-                capture_output=True, text=True, check=False
-            )
-            
-            # Extract port from output
-            if result.returncode == 0 and result.stdout.strip():
-                # Just take the first port if there are multiple
-                port = int(result.stdout.strip().split()[0])
-                self.port_allocations[service_id] = port
+            # Get port mappings from the container details, taking the first port if there are multiple
+            container_info = self._inspect(service_id)
+            port = self._port_from_inspect(container_info) if container_info else None
+            if port is not None:
+                with self._port_allocations_lock:
+                    self.port_allocations[service_id] = port
                 logger.info(f"Updated port mapping for {service_id}: {port}")
                 return port
                 
@@ -168,6 +190,313 @@ class ComposeManager:
             
         return None
         
+    def _get_container_name(self, service_id: str) -> str:
+        """Get the name docker compose gives to a service's container.
+        
+        Args:
+            service_id: The service ID
+            
+        Returns:
+            Container name
+        """
+        # The docker-compose project name is the compose file's directory name
+        return f"{self._project_dir_name}-{service_id}-1"
+    
+    def _get_docker_client(self) -> Optional[Any]:
+        """Get a Docker Engine API client, connecting on first use.
+        
+        The client keeps its connection to the Docker socket open, which is much
+        cheaper than starting the docker CLI for every read.
+        
+        Returns:
+            Docker client, or None if the Engine API is unavailable and the CLI must be used
+        """
+        with self._docker_client_lock:
+            if self._docker_client is None:
+                # The docker SDK is slow to import, so only load it once it is needed
+                import docker
+                from docker.errors import DockerException
+                
+                try:
+                    self._docker_client = docker.from_env()
+                except DockerException as e:
+                    logger.warning(f"Docker Engine API unavailable, using the docker CLI: {str(e)}")
+                    self._docker_client = False
+            return self._docker_client or None
+    
+    def _inspect(self, service_id: str) -> Optional[Dict[str, Any]]:
+        """Get the docker inspect data of a service's container.
+        
+        Args:
+            service_id: The service ID
+            
+        Returns:
+            Container details if the container could be inspected, None otherwise
+        """
+        return self._inspect_many([service_id]).get(service_id)
+    
+    def _inspect_many(self, service_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the docker inspect data of several services' containers at once.
+        
+        Containers that aren't cached are read through the Docker Engine API, or
+        with a single docker inspect call if the API is unavailable. Results are
+        reused for a few seconds, see STATE_CACHE_TTL.
+        
+        Args:
+            service_ids: The service IDs
+            
+        Returns:
+            Dictionary mapping service ID -> container details, for the containers
+            that could be inspected
+        """
+        found = {}
+        to_inspect = {}  # Maps container name -> service_id
+        for service_id in service_ids:
+            cached = self._inspect_cache.get(service_id)
+            if cached is not None and self._is_fresh(cached[0]):
+                found[service_id] = cached[1]
+            else:
+                to_inspect[self._get_container_name(service_id)] = service_id
+        
+        if not to_inspect:
+            return found
+        
+        # Prefer the Engine API, which reuses one connection to the Docker socket
+        client = self._get_docker_client()
+        if client is not None:
+            from docker.errors import DockerException, NotFound
+            
+            try:
+                for container_name, service_id in list(to_inspect.items()):
+                    try:
+                        container_info = client.api.inspect_container(container_name)
+                    except NotFound:
+                        container_info = None
+                    if container_info is not None:
+                        self._inspect_cache[service_id] = (time.monotonic(), container_info)
+                        found[service_id] = container_info
+                    del to_inspect[container_name]
+                return found
+            except DockerException as e:
+                logger.warning(f"Docker Engine API request failed, using the docker CLI: {str(e)}")
+        
+        # Get container info using docker inspect. When some containers are
+        # missing it fails, but still prints the ones it found, so stderr is not
+        # needed. The output stays bytes, which json.loads parses directly.
+        inspect_result = subprocess.run(
+            ["docker", "inspect", *to_inspect],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=False
+        )
+        if not inspect_result.stdout.strip():
+            return found
+        
+        # Parse container info
+        now = time.monotonic()
+        for container_info in json.loads(inspect_result.stdout) or []:
+            service_id = to_inspect.get(container_info.get("Name", "").lstrip("/"))
+            if service_id is None and len(to_inspect) == 1 and inspect_result.returncode == 0:
+                # A single successful inspect always describes the requested container
+                service_id = next(iter(to_inspect.values()))
+            if service_id is not None:
+                self._inspect_cache[service_id] = (now, container_info)
+                found[service_id] = container_info
+        return found
+    
+    def _is_fresh(self, cached_at: float) -> bool:
+        """Check if a cached container state can still be used.
+        
+        Args:
+            cached_at: time.monotonic() when the state was cached
+            
+        Returns:
+            True if the state is still valid, False otherwise
+        """
+        # Followed docker events invalidate changed services, the longer TTL only covers missed events
+        ttl = EVENTS_CACHE_TTL if self._events_active else self._inspect_ttl
+        return time.monotonic() - cached_at < ttl
+    
+    def start_event_listener(self) -> None:
+        """Follow docker events in the background to keep the cached state current.
+        
+        While the listener is running, cached container state is kept until a
+        container event says it changed, or at most EVENTS_CACHE_TTL, instead of
+        expiring after STATE_CACHE_TTL.
+        """
+        if self._event_thread is not None and self._event_thread.is_alive():
+            return
+        
+        self._event_thread = threading.Thread(target=self._pump_events, name="docker-events", daemon=True)
+        self._event_thread.start()
+    
+    def _pump_events(self) -> None:
+        """Read container events from docker events and invalidate the affected services."""
+        while True:
+            try:
+                for event in self._follow_events():
+                    # Health checks run as exec events, which don't change container state
+                    if event.get("Action", "").startswith("exec_"):
+                        continue
+                    service_id = event.get("Actor", {}).get("Attributes", {}).get("com.docker.compose.service")
+                    if service_id:
+                        self._invalidate_state_cache(service_id)
+            except Exception as e:
+                logger.error(f"Error following docker events: {str(e)}")
+            finally:
+                self._events_active = False
+            
+            logger.warning("docker events stopped, falling back to cached state with expiry")
+            time.sleep(5)
+    
+    def _follow_events(self) -> Iterator[Dict[str, Any]]:
+        """Stream container events, from the Engine API or else the docker CLI.
+        
+        Yields:
+            Decoded docker events
+        """
+        client = self._get_docker_client()
+        if client is not None:
+            logger.info("Following container events through the Docker Engine API")
+            stream = client.events(decode=True, filters={"type": "container"})
+            try:
+                self._start_following_events()
+                yield from stream
+            finally:
+                stream.close()
+            return
+        
+        cmd = ["docker", "events", "--format", "{{json .}}", "--filter", "type=container"]
+        logger.info(f"Following container events: {' '.join(cmd)}")
+        # Events are read as bytes, json.loads parses them without decoding first
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+            self._start_following_events()
+            for line in proc.stdout:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    
+    def _start_following_events(self) -> None:
+        """Drop all cached state and keep cache entries until events invalidate them."""
+        # Anything may have changed while no events were followed
+        self._inspect_cache.clear()
+        self._service_state_cache = {}
+        self._running_services_cache = None
+        self._events_active = True
+    
+    def _invalidate_state_cache(self, service_id: str) -> None:
+        """Forget cached container state after a service was started or stopped.
+        
+        Args:
+            service_id: The service ID
+        """
+        self._inspect_cache.pop(service_id, None)
+        self._service_state_cache.pop(service_id, None)
+        self._running_services_cache = None
+    
+    @staticmethod
+    def _port_from_inspect(container_info: Dict[str, Any]) -> Optional[int]:
+        """Get the first published host port from docker inspect data.
+        
+        Args:
+            container_info: docker inspect data of a container
+            
+        Returns:
+            Host port if the container publishes one, None otherwise
+        """
+        for bindings in (container_info.get("NetworkSettings", {}).get("Ports") or {}).values():
+            if bindings and bindings[0].get("HostPort"):
+                return int(bindings[0]["HostPort"])
+        return None
+    
+    def _refresh_all_ports(self) -> None:
+        """Look up the host ports of all running services in bulk.
+        
+        Compose V2 reports the published ports in the same docker compose ps call
+        that lists the services. docker-compose v1 doesn't, so the containers are
+        inspected with a single docker inspect call instead.
+        """
+        running_services = self._refresh_running_services()
+        if not self._use_legacy_compose:
+            return
+        
+        for service_id, container_info in self._inspect_many(sorted(running_services)).items():
+            port = self._port_from_inspect(container_info)
+            if port is not None:
+                with self._port_allocations_lock:
+                    self.port_allocations[service_id] = port
+    
+    def _build_service_info(self, service_id: str, container_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the service information returned by get_service_info.
+        
+        Args:
+            service_id: The service ID
+            container_info: docker inspect data of the service's container
+            
+        Returns:
+            Dictionary with service information
+        """
+        # Extract relevant information
+        status = container_info["State"]["Status"]
+        running = container_info["State"]["Running"]
+        health = container_info.get("State", {}).get("Health", {}).get("Status", "unknown")
+        
+        # Get port, reading it from the inspect data we already have when not known yet
+        host_port = self.port_allocations.get(service_id)
+        if host_port is None:
+            host_port = self._port_from_inspect(container_info)
+            if host_port is not None:
+                with self._port_allocations_lock:
+                    self.port_allocations[service_id] = host_port
+        
+        return {
+            "exists": True,
+            "id": container_info["Id"],
+            "status": status,
+            "running": running,
+            "health": health,
+            "host_port": host_port,
+            "created": container_info["Created"],
+            "image": container_info["Config"]["Image"]
+        }
+    
+    @staticmethod
+    def _service_info_from_ps(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build service information from a docker compose ps --format json row.
+        
+        Args:
+            row: Container reported by docker compose ps
+            
+        Returns:
+            Dictionary with service information without the host port, None if the
+            row lacks a field that only docker inspect can provide
+        """
+        created = row.get("CreatedAt", row.get("Created"))
+        if not row.get("ID") or not row.get("State") or not row.get("Image") or created is None:
+            return None
+        return {
+            "exists": True,
+            "id": row["ID"],
+            "status": row["State"],
+            "running": row["State"] == "running",
+            "health": row.get("Health") or "unknown",
+            "created": created,
+            "image": row["Image"]
+        }
+    
+    def _get_listed_service_info(self, service_id: str) -> Optional[Dict[str, Any]]:
+        """Get the service information reported by the last docker compose ps listing.
+        
+        Args:
+            service_id: The service ID
+            
+        Returns:
+            Dictionary with service information, None if it must come from docker inspect
+        """
+        service_info = self._service_state_cache.get(service_id)
+        if service_info is None:
+            return None
+        return {**service_info, "host_port": self.get_port_for_server(service_id)}
+    
     def get_service_info(self, service_id: str) -> Dict[str, Any]:
         """Get information about a service.
         
@@ -189,43 +518,18 @@ class ComposeManager:
                 logger.warning(f"Service {service_id} exists in config but is not running")
                 return {"exists": False}
                 
+            # Use the state reported while listing the services if there is one
+            service_info = self._get_listed_service_info(service_id)
+            if service_info is not None:
+                return service_info
+                
             # Get service container details
-            dir_name = os.path.basename(os.path.dirname(os.path.abspath(self.compose_path)))
-            container_name = f"{dir_name}-{service_id}-1"
-            
-            # Get container info using docker inspect
-            inspect_result = subprocess.run(
-                ["docker", "inspect", container_name],
-                capture_output=True, text=True, check=False
-            )
-            
-            if inspect_result.returncode != 0:
+            container_info = self._inspect(service_id)
+            if container_info is None:
                 logger.warning(f"Could not inspect container for {service_id}")
                 return {"exists": False}
-                
-            # Parse container info
-            container_info = yaml.safe_load(inspect_result.stdout)[0]
-            
-            # Extract relevant information
-            status = container_info["State"]["Status"]
-            running = container_info["State"]["Running"]
-            health = container_info.get("State", {}).get("Health", {}).get("Status", "unknown")
-            
-            # Get port
-            host_port = self.port_allocations.get(service_id)
-            if host_port is None:
-                host_port = self._update_port_for_server(service_id)
-            
-            return {
-                "exists": True,
-                "id": container_info["Id"],
-                "status": status,
-                "running": running,
-                "health": health,
-                "host_port": host_port,
-                "created": container_info["Created"],
-                "image": container_info["Config"]["Image"]
-            }
+            
+            return self._build_service_info(service_id, container_info)
             
         except Exception as e:
             logger.error(f"Failed to get service info for {service_id}: {str(e)}")
@@ -248,31 +552,18 @@ class ComposeManager:
                 return False
                 
             # Start the service
-            if self._use_legacy_compose:
-                cmd = ["docker-compose", "-f", self.compose_path, "up", "-d", service_id]
-                logger.info(f"Starting service (legacy): {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            else:
-                # When using modern docker compose, change to the directory first
-                old_cwd = os.getcwd()
-                file_name = os.path.basename(self.compose_path)
-                try:
-                    os.chdir(os.path.dirname(os.path.abspath(self.compose_path)))
-                    cmd = ["docker", "compose", "-f", file_name, "up", "-d", service_id]
-                    logger.info(f"Starting service (modern): {' '.join(cmd)}")
-                    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-                finally:
-                    # Restore the original working directory
-                    os.chdir(old_cwd)
+            result = self._run_compose("Starting service", "up", "-d", service_id)
             
             if result.returncode != 0:
                 logger.error(f"Failed to start service {service_id}: {result.stderr}")
                 return False
                 
             logger.info(f"Started service {service_id}")
+            self._invalidate_state_cache(service_id)
             
-            # Update port allocation
-            self._update_port_for_server(service_id)
+            # The port may have changed, it is looked up again on next use
+            with self._port_allocations_lock:
+                self.port_allocations.pop(service_id, None)
             
             return True
             
@@ -280,6 +571,54 @@ class ComposeManager:
             logger.error(f"Error starting service {service_id}: {str(e)}")
             return False
     
+    def start_services(self, service_ids: List[str]) -> List[str]:
+        """Start several services with a single docker-compose up.
+        
+        Compose starts the services in parallel itself and creates the project
+        network and shared dependencies only once. If that fails, for example
+        because one image is missing, the services are started one by one so
+        a single bad service doesn't hold back the others.
+        
+        Args:
+            service_ids: The service IDs
+            
+        Returns:
+            The service IDs that were started
+        """
+        try:
+            # Only services in the compose file can be started
+            compose_services = self.config_manager.load_compose_data().get('services', {})
+            known = []
+            for service_id in service_ids:
+                if service_id in compose_services:
+                    known.append(service_id)
+                else:
+                    logger.warning(f"Service {service_id} not found in compose file")
+            if not known:
+                return []
+                
+            # Start the services
+            result = self._run_compose("Starting services", "up", "-d", *known)
+            
+            if result.returncode != 0:
+                logger.error(f"Failed to start services {', '.join(known)}, starting them one by one: {result.stderr}")
+                return [service_id for service_id in known if self.start_service(service_id)]
+                
+            logger.info(f"Started services {', '.join(known)}")
+            for service_id in known:
+                self._invalidate_state_cache(service_id)
+            
+            # The ports may have changed, they are looked up again on next use
+            with self._port_allocations_lock:
+                for service_id in known:
+                    self.port_allocations.pop(service_id, None)
+            
+            return known
+            
+        except Exception as e:
+            logger.error(f"Error starting services {', '.join(service_ids)}: {str(e)}")
+            return []
+    
     def stop_service(self, service_id: str) -> bool:
         """Stop a service using docker-compose.
         
@@ -291,32 +630,18 @@ class ComposeManager:
         """
         try:
             # Stop the service
-            if self._use_legacy_compose:
-                cmd = ["docker-compose", "-f", self.compose_path, "stop", service_id]
-                logger.info(f"Stopping service (legacy): {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            else:
-                # When using modern docker compose, change to the directory first
-                old_cwd = os.getcwd()
-                file_name = os.path.basename(self.compose_path)
-                try:
-                    os.chdir(os.path.dirname(os.path.abspath(self.compose_path)))
-                    cmd = ["docker", "compose", "-f", file_name, "stop", service_id]
-                    logger.info(f"Stopping service (modern): {' '.join(cmd)}")
-                    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-                finally:
-                    # Restore the original working directory
-                    os.chdir(old_cwd)
+            result = self._run_compose("Stopping service", "stop", service_id)
             
             if result.returncode != 0:
                 logger.error(f"Failed to stop service {service_id}: {result.stderr}")
                 return False
                 
             logger.info(f"Stopped service {service_id}")
+            self._invalidate_state_cache(service_id)
             
             # Remove port allocation
-            if service_id in self.port_allocations:
-                del self.port_allocations[service_id]
+            with self._port_allocations_lock:
+                self.port_allocations.pop(service_id, None)
                 
             return True
             
@@ -335,31 +660,18 @@ class ComposeManager:
         """
         try:
             # Restart the service
-            if self._use_legacy_compose:
-                cmd = ["docker-compose", "-f", self.compose_path, "restart", service_id]
-                logger.info(f"Restarting service (legacy): {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            else:
-                # When using modern docker compose, change to the directory first
-                old_cwd = os.getcwd()
-                file_name = os.path.basename(self.compose_path)
-                try:
-                    os.chdir(os.path.dirname(os.path.abspath(self.compose_path)))
-                    cmd = ["docker", "compose", "-f", file_name, "restart", service_id]
-                    logger.info(f"Restarting service (modern): {' '.join(cmd)}")
-                    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-                finally:
-                    # Restore the original working directory
-                    os.chdir(old_cwd)
+            result = self._run_compose("Restarting service", "restart", service_id)
             
             if result.returncode != 0:
                 logger.error(f"Failed to restart service {service_id}: {result.stderr}")
                 return False
                 
             logger.info(f"Restarted service {service_id}")
+            self._invalidate_state_cache(service_id)
             
-            # Update port allocation
-            self._update_port_for_server(service_id)
+            # The port may have changed, it is looked up again on next use
+            with self._port_allocations_lock:
+                self.port_allocations.pop(service_id, None)
             
             return True
             
@@ -384,41 +696,59 @@ class ComposeManager:
             # Get MCP service configurations
             mcp_services = self.config_manager.get_mcp_servers()
             
-            # Process each MCP service
+            # List the running services once for the whole sync pass
+            running_services = self._refresh_running_services()
+            
+            # Work out which services need to be started, restarted or stopped
+            to_start = []
+            to_restart = []
+            to_stop = []
             for service_id, service_meta in mcp_services.items():
-                try:
-                    if service_meta.get('disabled', False):
-                        # Service is disabled, stop it if it exists
-                        if self._service_exists(service_id):
-                            if self.stop_service(service_id):
-                                results["stopped"].append(service_id)
-                        continue
-                        
-                    # Start or update service
-                    if not self._service_exists(service_id):
-                        # Service doesn't exist, start it
-                        if self.start_service(service_id):
-                            results["created"].append(service_id)
-                    else:
-                        # Service exists, restart it to apply any config changes
-                        if self.restart_service(service_id):
-                            results["updated"].append(service_id)
-                
-                except Exception as e:
-                    logger.error(f"Error processing service {service_id}: {str(e)}")
-                    results["errors"].append(f"{service_id}: {str(e)}")
+                if service_meta.get('disabled', False):
+                    # Service is disabled, stop it if it exists
+                    if service_id in running_services:
+                        to_stop.append(service_id)
+                elif service_id not in running_services:
+                    # Service doesn't exist, start it
+                    to_start.append(service_id)
+                else:
+                    # Service exists, restart it to apply any config changes
+                    to_restart.append(service_id)
             
             # Clean up services not in config
             compose_data = self.config_manager.load_compose_data()
-            running_services = self._get_running_services()
             
             for service_id in running_services:
                 if service_id not in mcp_services and service_id in compose_data.get('services', {}):
+                    to_stop.append(service_id)
+            
+            # New services are started together so Compose sets up the network and shared dependencies once
+            if to_start:
+                started = self.start_services(to_start)
+                results["created"].extend(started)
+                results["errors"].extend(f"{service_id}: failed to start"
+                                         for service_id in to_start if service_id not in started)
+            
+            # Restarts and stops touch existing containers only, so they are handled concurrently
+            with ThreadPoolExecutor(max_workers=SYNC_MAX_WORKERS) as executor:
+                futures = {}
+                for action, service_ids, result_key in ((self.restart_service, to_restart, "updated"),
+                                                        (self.stop_service, to_stop, "stopped")):
+                    for service_id in service_ids:
+                        futures[executor.submit(action, service_id)] = (service_id, result_key)
+                
+                for future in as_completed(futures):
+                    service_id, result_key = futures[future]
                     try:
-                        if self.stop_service(service_id):
-                            results["stopped"].append(service_id)
+                        if future.result():
+                            results[result_key].append(service_id)
                     except Exception as e:
-                        logger.error(f"Error stopping orphaned service {service_id}: {str(e)}")
+                        logger.error(f"Error processing service {service_id}: {str(e)}")
+                        results["errors"].append(f"{service_id}: {str(e)}")
+            
+            # Look up the ports of the started and restarted services in one go
+            if to_start or to_restart:
+                self._refresh_all_ports()
             
             logger.info(f"Service sync complete: {len(results['created'])} created, " 
                         f"{len(results['updated'])} updated, {len(results['stopped'])} stopped")
@@ -429,40 +759,82 @@ class ComposeManager:
             results["errors"].append(f"General error: {str(e)}")
             return results
             
-    def _get_running_services(self) -> List[str]:
-        """Get list of currently running services.
+    def _get_running_service_set(self) -> Set[str]:
+        """Get the currently running services, listed at most once per STATE_CACHE_TTL.
+        
+        Returns:
+            Set of service IDs
+        """
+        if self._running_services_cache is not None and self._is_fresh(self._running_services_cache[0]):
+            return self._running_services_cache[1]
+        return self._refresh_running_services()
+    
+    def _refresh_running_services(self) -> Set[str]:
+        """List the running services with a single docker compose ps call.
         
         Returns:
-            List of service IDs
+            Set of service IDs, empty if they could not be listed
         """
         try:
-            # Use legacy docker-compose for this system since docker compose is having issues
             if self._use_legacy_compose:
-                cmd = ["docker-compose", "-f", self.compose_path, "ps", "--services"]
-                logger.info(f"Using command (legacy): {' '.join(cmd)}")
+                # docker-compose v1 has no JSON output, list the service names only
+                result = self._run_compose("Listing services", "ps", "--services")
             else:
-                # For Docker Compose V2
-                # Force simple command structure and try without "-f" as a workaround for the flag parsing issue
-                os.chdir(os.path.dirname(os.path.abspath(self.compose_path)))
-                file_name = os.path.basename(self.compose_path)
-                cmd = ["docker", "compose", "-f", file_name, "ps", "--services"]
-                logger.info(f"Using command (modern with workaround): {' '.join(cmd)}")
-                
-            logger.info(f"Running command: {' '.join(cmd)}")
-                  
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+                result = self._run_compose("Listing services", "ps", "--format", "json")
             
             if result.returncode != 0:
                 logger.error(f"Failed to list services: {result.stderr}")
-                return []
-                
+                return set()
+            
             # Parse output
-            services = [s for s in result.stdout.strip().split('\n') if s]
+            if self._use_legacy_compose:
+                # Service names contain no whitespace, so one split gives the set directly
+                services = set(result.stdout.split())
+            else:
+                services = set()
+                service_states = {}
+                for row in self._parse_ps_json(result.stdout):
+                    if not row.get("Service"):
+                        continue
+                    services.add(row["Service"])
+                    
+                    # Keep the reported state so get_service_info needn't inspect the container
+                    service_info = self._service_info_from_ps(row)
+                    if service_info is not None:
+                        service_states[row["Service"]] = service_info
+                    
+                    # Record the published port while we have it
+                    for publisher in row.get("Publishers") or []:
+                        if publisher.get("PublishedPort"):
+                            with self._port_allocations_lock:
+                                self.port_allocations[row["Service"]] = int(publisher["PublishedPort"])
+                            break
+                self._service_state_cache = service_states
+            self._running_services_cache = (time.monotonic(), services)
             return services
             
         except Exception as e:
             logger.error(f"Error listing services: {str(e)}")
+            return set()
+    
+    @staticmethod
+    def _parse_ps_json(output: str) -> List[Dict[str, Any]]:
+        """Parse the output of docker compose ps --format json.
+        
+        Older Compose V2 releases print a JSON array, newer ones one JSON object per line.
+        
+        Args:
+            output: Standard output of the command
+            
+        Returns:
+            List of containers
+        """
+        output = output.strip()
+        if not output:
             return []
+        if output.startswith('['):
+            return json.loads(output)
+        return [json.loads(line) for line in output.splitlines() if line.strip()]
     
     def get_all_service_info(self) -> Dict[str, Dict[str, Any]]:
         """Get information about all MCP services.
@@ -475,11 +847,45 @@ class ComposeManager:
         # Get MCP service configurations
         mcp_services = self.config_manager.get_mcp_servers()
         
-        # Get info for each service
-        for service_id in mcp_services.keys():
-            info[service_id] = self.get_service_info(service_id)
+        try:
+            compose_data = self.config_manager.load_compose_data()
+            running_services = self._get_running_service_set()
+            
+            # Only services that are in the compose file and running have a container to inspect
+            to_inspect = []
+            for service_id in mcp_services.keys():
+                if service_id not in compose_data.get('services', {}):
+                    logger.warning(f"Service {service_id} not found in compose file")
+                    info[service_id] = {"exists": False}
+                elif service_id not in running_services:
+                    logger.warning(f"Service {service_id} exists in config but is not running")
+                    info[service_id] = {"exists": False}
+                else:
+                    service_info = self._get_listed_service_info(service_id)
+                    if service_info is not None:
+                        info[service_id] = service_info
+                    else:
+                        to_inspect.append(service_id)
             
-        return info
+            # Inspect all the containers with a single docker call
+            container_infos = self._inspect_many(to_inspect)
+            for service_id in to_inspect:
+                try:
+                    if service_id not in container_infos:
+                        logger.warning(f"Could not inspect container for {service_id}")
+                        info[service_id] = {"exists": False}
+                    else:
+                        info[service_id] = self._build_service_info(service_id, container_infos[service_id])
+                except Exception as e:
+                    logger.error(f"Failed to get service info for {service_id}: {str(e)}")
+                    info[service_id] = {"exists": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Failed to get service info: {str(e)}")
+            for service_id in mcp_services.keys():
+                info.setdefault(service_id, {"exists": False, "error": str(e)})
+        
+        # Keep the configuration order
+        return {service_id: info[service_id] for service_id in mcp_services.keys()}
     
     def get_port_for_server(self, server_id: str) -> Optional[int]:
         """Get the host port assigned to a server.
@@ -4,12 +4,62 @@ import json
 import yaml
 import os
 import configparser
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from orchestrator.utils.logging import setup_logging
 
+# Use the libyaml C parser and emitter when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
 # Set up logger
 logger = setup_logging(__name__)
 
+# Types of the non-string settings, applied once when the settings file is read
+SETTING_TYPES = {
+    ("aws", "max_pool_connections"): int,
+    ("service", "reconciliation_interval_seconds"): int,
+    ("service", "port_range_start"): int,
+    ("service", "port_range_end"): int
+}
+
+def _parse_settings_file(path: str) -> Dict[str, Dict[str, str]]:
+    """Read an INI style settings file.
+    
+    Only a subset of INI is understood: [section] headers, key = value or
+    key: value lines and full-line # or ; comments. There is no interpolation,
+    DEFAULT section or multi-line values, and keys are lowercased like
+    configparser does. Other lines are skipped with a warning.
+    
+    Args:
+        path: Path to the settings file
+        
+    Returns:
+        Dictionary mapping section names to their key/value pairs
+    """
+    sections: Dict[str, Dict[str, str]] = {}
+    current = None
+    
+    with open(path, "r") as f:
+        lines = f.read().splitlines()
+        
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line[0] == "[" and line[-1] == "]":
+            current = sections.setdefault(line[1:-1].strip(), {})
+            continue
+        # Like configparser, the first = or : separates the key from the value
+        split_at = min((i for i in (line.find("="), line.find(":")) if i > 0), default=-1)
+        if split_at < 0 or current is None:
+            logger.warning(f"Ignoring line {line_number} of {path}: {line}")
+            continue
+        current[line[:split_at].strip().lower()] = line[split_at + 1:].strip()
+            
+    return sections
+
 class ConfigManager:
     """Handles loading and managing configuration for the MCP Orchestrator."""
 
@@ -24,7 +74,13 @@ class ConfigManager:
         self.compose_path = compose_path
         self.settings_path = settings_path
         self.compose_data = {}
+        self._compose_stat: Optional[Tuple[int, int]] = None  # (mtime, size) of the loaded compose file
+        # MCP servers extracted from compose_data, and the compose_data they were extracted from
+        self._mcp_servers: Dict[str, Any] = {}
+        self._mcp_servers_source: Optional[Dict[str, Any]] = None
         self.settings = {}
+        self._settings_stat: Optional[Tuple[int, int]] = None  # (mtime, size) of the loaded settings file
+        self._settings_flat: Dict[tuple, Any] = {}  # Maps (section, key) -> value
         self.load_config()
 
     def load_config(self) -> None:
@@ -34,7 +90,10 @@ class ConfigManager:
         logger.info("Configuration loaded successfully")
 
     def _load_compose_data(self) -> Dict[str, Any]:
-        """Load Docker Compose configuration from YAML file."""
+        """Load Docker Compose configuration from YAML file.
+        
+        The file is only parsed again when its modification time or size has changed.
+        """
         try:
             if not os.path.exists(self.compose_path):
                 logger.warning(f"Compose file {self.compose_path} not found, creating empty config")
@@ -42,8 +101,14 @@ class ConfigManager:
                 self._save_default_compose()
                 return self.compose_data
 
+            st = os.stat(self.compose_path)
+            compose_stat = (st.st_mtime_ns, st.st_size)
+            if compose_stat == self._compose_stat:
+                return self.compose_data
+
             with open(self.compose_path, "r") as f:
-                self.compose_data = yaml.safe_load(f) or {}
+                self.compose_data = yaml.load(f, Loader=SafeLoader) or {}
+            self._compose_stat = compose_stat
                 
             # Validate structure
             if "services" not in self.compose_data:
@@ -51,6 +116,8 @@ class ConfigManager:
                 self.compose_data = {"version": "3", "services": {}}
                 self._save_default_compose()
             
+            self._normalize_labels(self.compose_data)
+            
             logger.info(f"Loaded {len(self.compose_data.get('services', {}))} service configurations")
             return self.compose_data
         
@@ -63,15 +130,38 @@ class ConfigManager:
             self.compose_data = {"version": "3", "services": {}}
             return self.compose_data
             
+    @staticmethod
+    def _normalize_labels(compose_data: Dict[str, Any]) -> None:
+        """Convert list form service labels ("key=value" strings) to dicts, in place.
+        
+        Args:
+            compose_data: Loaded Docker Compose configuration
+        """
+        for service_config in (compose_data.get('services') or {}).values():
+            labels = service_config.get('labels')
+            if isinstance(labels, list):
+                label_dict = {}
+                for label in labels:
+                    if '=' in label:
+                        key, value = label.split('=', 1)
+                        label_dict[key] = value
+                service_config['labels'] = label_dict
+            
     def load_compose_data(self) -> Dict[str, Any]:
-        """Reload and return the Docker Compose data."""
+        """Reload the Docker Compose data if the file changed, and return it."""
         return self._load_compose_data()
 
+    def invalidate(self) -> None:
+        """Force the compose file to be parsed again on the next load."""
+        self._compose_stat = None
+
     def _save_default_compose(self) -> None:
         """Save default Docker Compose configuration to file."""
         try:
             with open(self.compose_path, "w") as f:
-                yaml.dump(self.compose_data, f, default_flow_style=False)
+                yaml.dump(self.compose_data, f, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+            # The file we just wrote must be parsed again on the next load
+            self.invalidate()
             
             logger.info(f"Default Docker Compose configuration saved to {self.compose_path}")
         
@@ -79,17 +169,27 @@ class ConfigManager:
             logger.error(f"Error saving default Docker Compose configuration: {str(e)}")
 
     def _load_settings(self) -> None:
-        """Load settings from configuration file."""
+        """Load settings from configuration file.
+        
+        The file is only parsed again when its modification time or size has changed.
+        """
         try:
-            config = configparser.ConfigParser()
-            
+            if os.path.exists(self.settings_path):
+                st = os.stat(self.settings_path)
+                settings_stat = (st.st_mtime_ns, st.st_size)
+                if settings_stat == self._settings_stat:
+                    return
+            else:
+                settings_stat = None
+                
             # Define default settings
             self.settings = {
                 "aws": {
                     "region": "us-west-2",
                     "alb_arn": "",
                     "listener_arn": "",
-                    "vpc_id": ""
+                    "vpc_id": "",
+                    "max_pool_connections": 50
                 },
                 "service": {
                     "reconciliation_interval_seconds": 60,
@@ -107,18 +207,15 @@ class ConfigManager:
             }
             
             # Load from file if exists
-            if os.path.exists(self.settings_path) and os.path.getsize(self.settings_path) > 0:
-                config.read(self.settings_path)
+            if settings_stat is not None and settings_stat[1] > 0:
+                config = _parse_settings_file(self.settings_path)
+                self._settings_stat = settings_stat
                 
                 # Update settings from file
-                if "aws" in config:
-                    self.settings["aws"].update({k: v for k, v in config["aws"].items()})
-                if "service" in config:
-                    self.settings["service"].update({k: v for k, v in config["service"].items()})
-                if "dashboard" in config:
-                    self.settings["dashboard"].update({k: v for k, v in config["dashboard"].items()})
-                if "logging" in config:
-                    self.settings["logging"].update({k: v for k, v in config["logging"].items()})
+                for section in ("aws", "service", "dashboard", "logging"):
+                    if section in config:
+                        for key, value in config[section].items():
+                            self.settings[section][key] = self._coerce_setting(section, key, value)
                 
                 logger.info("Settings loaded from file")
             else:
@@ -128,6 +225,34 @@ class ConfigManager:
         
         except Exception as e:
             logger.error(f"Error loading settings: {str(e)}")
+        
+        # Index the settings for get_setting
+        self._settings_flat = {
+            (section, key): value
+            for section, values in self.settings.items()
+            for key, value in values.items()
+        }
+
+    def _coerce_setting(self, section: str, key: str, value: str) -> Any:
+        """Convert a setting read from the settings file to its expected type.
+        
+        Args:
+            section: Settings section name
+            key: Setting key
+            value: Value as read from the file
+            
+        Returns:
+            The converted value, or the default if the value is invalid
+        """
+        setting_type = SETTING_TYPES.get((section, key))
+        if setting_type is None:
+            return value
+        try:
+            return setting_type(value)
+        except ValueError:
+            default = self.settings[section].get(key)
+            logger.warning(f"Invalid value {value!r} for setting {section}.{key}, using {default!r}")
+            return default
 
     def _save_default_settings(self) -> None:
         """Save default settings to file."""
@@ -150,27 +275,36 @@ class ConfigManager:
     def get_mcp_servers(self) -> Dict[str, Any]:
         """Get all configured MCP servers from Docker Compose configuration.
         
+        The result is computed once per loaded compose file and shared between
+        callers, who must not modify it.
+        
+        Returns:
+            Dictionary of MCP server configurations with metadata
+        """
+        compose_data = self.compose_data
+        if self._mcp_servers_source is not compose_data:
+            self._mcp_servers = self._extract_mcp_servers(compose_data)
+            self._mcp_servers_source = compose_data
+        return self._mcp_servers
+    
+    def _extract_mcp_servers(self, compose_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the MCP servers and their metadata from the compose data.
+        
+        Args:
+            compose_data: Loaded Docker Compose configuration
+            
         Returns:
             Dictionary of MCP server configurations with metadata
         """
         servers = {}
         
-        if not self.compose_data or 'services' not in self.compose_data:
+        if not compose_data or 'services' not in compose_data:
             return servers
             
-        for service_id, service_config in self.compose_data.get('services', {}).items():
-            # Extract MCP-specific metadata from labels
+        for service_id, service_config in compose_data.get('services', {}).items():
+            # Extract MCP-specific metadata from labels, already dicts once the compose file is loaded
             labels = service_config.get('labels', {})
             
-            # Handle string format labels (convert to dict if needed)
-            if isinstance(labels, list):
-                label_dict = {}
-                for label in labels:
-                    if '=' in label:
-                        key, value = label.split('=', 1)
-                        label_dict[key] = value
-                labels = label_dict
-                
             # Extract metadata
             disabled = str(labels.get('mcp.disabled', "false")).lower() == "true"
             path = labels.get('mcp.path', f"/mcp/{service_id}")
@@ -206,4 +340,4 @@ class ConfigManager:
         Returns:
             Setting value or default if not found
         """
-        return self.settings.get(section, {}).get(key, default)
+        return self._settings_flat.get((section, key), default)
@@ -1,11 +1,15 @@
 """Docker container manager for MCP Orchestrator."""
 
+import os
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import docker
-from docker.errors import DockerException, NotFound
-from typing import Dict, Any, List, Optional, Tuple
+from docker.errors import APIError, DockerException, ImageNotFound, NotFound
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from typing import Dict, Any, List, Optional, Set, Tuple
 import socket
-from tenacity import retry, stop_after_attempt, wait_exponential
+from datetime import datetime, timezone
 
 from orchestrator.utils.logging import setup_logging
 from orchestrator.config_manager import ConfigManager
@@ -13,6 +17,66 @@ from orchestrator.config_manager import ConfigManager
 # Set up logger
 logger = setup_logging(__name__)
 
+# Health markers in the status text of container listings, and the health status they stand for
+HEALTH_STATUS_MARKERS = (
+    ("(healthy)", "healthy"),
+    ("(unhealthy)", "unhealthy"),
+    ("(health: starting)", "starting")
+)
+
+# Maximum number of servers reconciled concurrently by sync_containers
+SYNC_MAX_WORKERS = 16
+
+# Kernel tables of TCP sockets, and the state code of listening sockets in them
+PROC_NET_TCP_FILES = ("/proc/net/tcp", "/proc/net/tcp6")
+TCP_LISTEN_STATE = "0A"
+
+
+def _get_listening_ports() -> Optional[Set[int]]:
+    """Get the TCP ports that have a listening socket on this host.
+    
+    Returns:
+        Set of listening ports, None if the kernel socket tables can't be read
+    """
+    if not os.path.exists(PROC_NET_TCP_FILES[0]):
+        return None
+    
+    ports = set()
+    try:
+        for path in PROC_NET_TCP_FILES:
+            if not os.path.exists(path):
+                continue
+            with open(path) as f:
+                next(f, None)  # Skip the header
+                for line in f:
+                    # Columns: sl local_address rem_address st ...; addresses are hex ip:port
+                    fields = line.split()
+                    if len(fields) > 3 and fields[3] == TCP_LISTEN_STATE:
+                        ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read listening ports, probing ports instead: {str(e)}")
+        return None
+    return ports
+
+
+# Number of attempts made to create a container when the Docker daemon has a transient failure
+CREATE_CONTAINER_ATTEMPTS = 3
+
+
+def _is_transient_docker_error(exception: BaseException) -> bool:
+    """Check if a Docker error is worth retrying.
+    
+    Args:
+        exception: The exception raised by a Docker call
+        
+    Returns:
+        True for daemon-side and connection errors, False for errors that would repeat
+    """
+    if isinstance(exception, APIError):
+        return exception.is_server_error()
+    return isinstance(exception, (RequestsConnectionError, ConnectionError))
+
+
 class ContainerManager:
     """Manages Docker containers for MCP services."""
 
@@ -24,13 +88,17 @@ class ContainerManager:
         """
         self.config_manager = config_manager
         self.client = None
+        self.api = None  # Low-level API client of self.client, for calls that only need plain dicts
         self.port_allocations = {}  # Maps server_id -> host_port
+        self._port_allocations_lock = threading.Lock()  # Containers are synced from several threads
         self._connect_docker()
         
     def _connect_docker(self) -> None:
         """Connect to Docker daemon."""
         try:
             self.client = docker.from_env()
+            # Shares the client's HTTP session, so both keep the daemon connection alive
+            self.api = self.client.api
             # Test connection
             self.client.ping()
             logger.info("Connected to Docker daemon")
@@ -49,12 +117,25 @@ class ContainerManager:
         Returns:
             An available port number
         """
-        port_range_start = int(self.config_manager.get_setting("service", "port_range_start", 8000))
-        port_range_end = int(self.config_manager.get_setting("service", "port_range_end", 9000))
+        port_range_start = self.config_manager.get_setting("service", "port_range_start", 8000)
+        port_range_end = self.config_manager.get_setting("service", "port_range_end", 9000)
         
         # Check already allocated ports
         allocated_ports = set(self.port_allocations.values())
         
+        # Take one snapshot of the listening ports instead of probing each port
+        listening_ports = _get_listening_ports()
+        if listening_ports is not None:
+            # Mark the used ports in a one byte per port map and let find() scan it for a free one
+            taken = bytearray(max(0, port_range_end - port_range_start + 1))
+            for port in allocated_ports | listening_ports:
+                if port_range_start <= port <= port_range_end:
+                    taken[port - port_range_start] = 1
+            free_index = taken.find(0)
+            if free_index != -1:
+                return port_range_start + free_index
+            raise RuntimeError(f"No available ports in range {port_range_start}-{port_range_end}")
+        
         # Try ports in the configured range
         for port in range(port_range_start, port_range_end + 1):
             if port in allocated_ports:
@@ -93,24 +174,27 @@ class ContainerManager:
             raise ValueError(f"Unsupported command: {config.get('command')}")
             
         args = config.get("args", [])
-        if not args or "run" not in args:
+        if not args:
             raise ValueError("Invalid Docker command format")
             
-        # Extract the image name
-        run_index = args.index("run")
+        # Extract the image name in one pass: find "run", then the first argument
+        # that is neither an option nor the value of a short option
+        run_index = None
         image_index = None
+        prev = None
         
-        for i in range(run_index + 1, len(args)):
-            # Skip options and their values
-            if args[i].startswith("-"):
-                continue
-            if i > 0 and args[i-1].startswith("-") and not args[i-1].startswith("--"):
-                continue
-                
-            # Found the image name
-            image_index = i
-            break
-            
+        for i, arg in enumerate(args):
+            if run_index is None:
+                if arg == "run":
+                    run_index = i
+            elif not arg.startswith("-") and not (prev.startswith("-") and not prev.startswith("--")):
+                # Found the image name
+                image_index = i
+                break
+            prev = arg
+            
+        if run_index is None:
+            raise ValueError("Invalid Docker command format")
         if image_index is None:
             raise ValueError("Could not find Docker image in command")
             
@@ -121,87 +205,104 @@ class ContainerManager:
         
         return image, command_args
 
-    def _container_exists(self, container_name: str) -> bool:
-        """Check if a container with the given name exists.
+    def create_container(self, server_id: str, config: Dict[str, Any]) -> Optional[str]:
+        """Create and start a Docker container for an MCP server.
         
         Args:
-            container_name: Name of the container to check
+            server_id: The MCP server ID
+            config: The MCP server configuration
             
         Returns:
-            True if container exists, False otherwise
+            Container ID if successful, None otherwise
         """
-        try:
-            self.client.containers.get(container_name)
-            return True
-        except NotFound:
-            return False
-        except Exception as e:
-            logger.error(f"Error checking container existence: {str(e)}")
-            return False
+        for attempt in range(1, CREATE_CONTAINER_ATTEMPTS + 1):
+            try:
+                return self._create_container(server_id, config)
+            except Exception as e:
+                if attempt < CREATE_CONTAINER_ATTEMPTS and _is_transient_docker_error(e):
+                    delay = min(10, 2 ** attempt)
+                    logger.warning(f"Failed to create container for {server_id}, retrying in {delay}s: {str(e)}")
+                    time.sleep(delay)
+                    continue
+                logger.error(f"Failed to create container for {server_id}: {str(e)}")
+                return None
+        return None
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def create_container(self, server_id: str, config: Dict[str, Any]) -> Optional[str]:
-        """Create and start a Docker container for an MCP server.
+    def _create_container(self, server_id: str, config: Dict[str, Any]) -> Optional[str]:
+        """Create and start a Docker container, letting errors propagate.
         
         Args:
             server_id: The MCP server ID
             config: The MCP server configuration
             
         Returns:
-            Container ID if successful, None otherwise
+            Container ID, None if the server is disabled
         """
-        try:
-            if config.get("disabled", False):
-                logger.info(f"Server {server_id} is disabled, skipping")
-                return None
-                
-            container_name = self._get_container_name(server_id)
+        if config.get("disabled", False):
+            logger.info(f"Server {server_id} is disabled, skipping")
+            return None
             
-            # Check if container already exists
-            if self._container_exists(container_name):
-                logger.info(f"Container {container_name} already exists")
-                return self.client.containers.get(container_name).id
-                
-            # Parse Docker command
-            image, command_args = self._parse_docker_command(config)
+        container_name = self._get_container_name(server_id)
+        
+        # Check if container already exists
+        try:
+            container_id = self.api.inspect_container(container_name)["Id"]
+            logger.info(f"Container {container_name} already exists")
+            return container_id
+        except NotFound:
+            pass
             
-            # Find available port and update port allocations
+        # Parse Docker command
+        image, command_args = self._parse_docker_command(config)
+        
+        # Find available port and update port allocations, atomically so concurrent creates get distinct ports.
+        # A port allocated by a failed earlier attempt is released first so the retry can reuse it.
+        with self._port_allocations_lock:
+            self.port_allocations.pop(server_id, None)
             host_port = self._find_available_port()
             self.port_allocations[server_id] = host_port
-            
-            # Set up port mapping (assuming container exposes port 8080)
-            container_port = 8080
-            ports = {f"{container_port}/tcp": host_port}
-            
-            # Set up environment variables
-            env_dict = config.get("env", {})
-            
-            # Create and start container
-            container = self.client.containers.run(
-                image=image,
-                name=container_name,
-                detach=True,
-                ports=ports,
-                environment=env_dict,
-                restart_policy={"Name": "always"},
-                labels={
-                    "mcp_service": server_id,
-                    "managed_by": "mcp-orchestrator"
-                }
-            )
-            
-            logger.info(f"Created container for {server_id} with ID {container.id}")
-            return container.id
-            
-        except Exception as e:
-            logger.error(f"Failed to create container for {server_id}: {str(e)}")
-            return None
+        
+        # Set up port mapping (assuming container exposes port 8080)
+        container_port = 8080
+        host_config = self.api.create_host_config(
+            port_bindings={container_port: host_port},
+            restart_policy={"Name": "always"}
+        )
+        
+        # Set up environment variables
+        env_dict = config.get("env", {})
+        
+        # Create and start container with the low-level API, which doesn't inspect the new container
+        create_args = dict(
+            image=image,
+            name=container_name,
+            detach=True,
+            ports=[container_port],
+            environment=env_dict,
+            host_config=host_config,
+            labels={
+                "mcp_service": server_id,
+                "managed_by": "mcp-orchestrator"
+            }
+        )
+        try:
+            container_id = self.api.create_container(**create_args)["Id"]
+        except ImageNotFound:
+            # Only pull when the image isn't present locally
+            logger.info(f"Image {image} not found locally, pulling it")
+            self.client.images.pull(image)
+            container_id = self.api.create_container(**create_args)["Id"]
+        self.api.start(container_id)
+        
+        logger.info(f"Created container for {server_id} with ID {container_id}")
+        return container_id
 
-    def stop_container(self, server_id: str) -> bool:
+    def stop_container(self, server_id: str, container: Optional[Any] = None) -> bool:
         """Stop and remove a container.
         
         Args:
             server_id: The MCP server ID
+            container: The server's container if already fetched, looked up otherwise
             
         Returns:
             True if successful, False otherwise
@@ -209,21 +310,21 @@ class ContainerManager:
         try:
             container_name = self._get_container_name(server_id)
             
-            # Check if container exists
-            if not self._container_exists(container_name):
-                logger.info(f"Container {container_name} does not exist")
-                return True
-                
-            # Get container
-            container = self.client.containers.get(container_name)
-            
             # Stop and remove container
-            container.stop(timeout=10)
-            container.remove()
+            if container is None:
+                try:
+                    self.api.stop(container_name, timeout=10)
+                    self.api.remove_container(container_name)
+                except NotFound:
+                    logger.info(f"Container {container_name} does not exist")
+                    return True
+            else:
+                container.stop(timeout=10)
+                container.remove()
             
             # Remove port allocation
-            if server_id in self.port_allocations:
-                del self.port_allocations[server_id]
+            with self._port_allocations_lock:
+                self.port_allocations.pop(server_id, None)
                 
             logger.info(f"Stopped and removed container {container_name}")
             return True
@@ -232,11 +333,12 @@ class ContainerManager:
             logger.error(f"Failed to stop container for {server_id}: {str(e)}")
             return False
 
-    def restart_container(self, server_id: str) -> bool:
+    def restart_container(self, server_id: str, container: Optional[Any] = None) -> bool:
         """Restart a container.
         
         Args:
             server_id: The MCP server ID
+            container: The server's container if already fetched, looked up otherwise
             
         Returns:
             True if successful, False otherwise
@@ -244,16 +346,15 @@ class ContainerManager:
         try:
             container_name = self._get_container_name(server_id)
             
-            # Check if container exists
-            if not self._container_exists(container_name):
-                logger.warning(f"Container {container_name} does not exist, cannot restart")
-                return False
-                
-            # Get container
-            container = self.client.containers.get(container_name)
-            
             # Restart container
-            container.restart(timeout=10)
+            if container is None:
+                try:
+                    self.api.restart(container_name, timeout=10)
+                except NotFound:
+                    logger.warning(f"Container {container_name} does not exist, cannot restart")
+                    return False
+            else:
+                container.restart(timeout=10)
             logger.info(f"Restarted container {container_name}")
             return True
             
@@ -273,38 +374,118 @@ class ContainerManager:
         try:
             container_name = self._get_container_name(server_id)
             
-            # Check if container exists
-            if not self._container_exists(container_name):
+            # Inspect the container, which also tells whether it exists
+            try:
+                container_info = self.api.inspect_container(container_name)
+            except NotFound:
                 logger.warning(f"Container {container_name} does not exist")
                 return {"exists": False}
-                
-            # Get container
-            container = self.client.containers.get(container_name)
-            
-            # Get container info
-            container_info = container.attrs
-            
-            # Extract relevant information
-            status = container_info["State"]["Status"]
-            running = container_info["State"]["Running"]
-            health = container_info.get("State", {}).get("Health", {}).get("Status", "unknown")
-            host_port = self.port_allocations.get(server_id)
-            
-            return {
-                "exists": True,
-                "id": container.id,
-                "status": status,
-                "running": running,
-                "health": health,
-                "host_port": host_port,
-                "created": container_info["Created"],
-                "image": container_info["Config"]["Image"]
-            }
+            
+            return self._container_info_from(server_id, container_info)
             
         except Exception as e:
             logger.error(f"Failed to get container info for {server_id}: {str(e)}")
             return {"exists": False, "error": str(e)}
 
+    def _container_info_from(self, server_id: str, container_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the container information from a container's inspect data.
+        
+        Args:
+            server_id: The MCP server ID
+            container_info: The container's inspect data
+            
+        Returns:
+            Dictionary with container information
+        """
+        # Extract relevant information
+        status = container_info["State"]["Status"]
+        running = container_info["State"]["Running"]
+        health = container_info.get("State", {}).get("Health", {}).get("Status", "unknown")
+        host_port = self.port_allocations.get(server_id)
+        
+        return {
+            "exists": True,
+            "id": container_info["Id"],
+            "status": status,
+            "running": running,
+            "health": health,
+            "host_port": host_port,
+            "created": container_info["Created"],
+            "image": container_info["Config"]["Image"]
+        }
+
+    def _container_info_from_summary(self, server_id: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the container information from a container listing entry.
+        
+        Args:
+            server_id: The MCP server ID
+            summary: The container's entry in the container list
+            
+        Returns:
+            Dictionary with container information, like _container_info_from
+        """
+        # The listing only reports health as part of the status text, e.g. "Up 5 minutes (healthy)"
+        status_text = summary.get("Status", "")
+        health = "unknown"
+        for marker, health_status in HEALTH_STATUS_MARKERS:
+            if marker in status_text:
+                health = health_status
+                break
+        
+        return {
+            "exists": True,
+            "id": summary["Id"],
+            "status": summary["State"],
+            "running": summary["State"] == "running",
+            "health": health,
+            "host_port": self.port_allocations.get(server_id),
+            "created": datetime.fromtimestamp(summary["Created"], timezone.utc).isoformat().replace("+00:00", "Z"),
+            "image": summary["Image"]
+        }
+
+    def _reconcile_one(self, server_id: str, config: Dict[str, Any],
+                       container: Optional[Any]) -> Tuple[str, Optional[str]]:
+        """Bring one server's container in line with its configuration.
+        
+        Args:
+            server_id: The MCP server ID
+            config: The MCP server configuration
+            container: The server's existing container, None if it has none
+            
+        Returns:
+            Tuple of (server_id, results key of the action taken or None)
+        """
+        if config.get("disabled", False):
+            # Server is disabled, stop container if it exists
+            if container is not None:
+                self.stop_container(server_id, container)
+                return server_id, "stopped"
+            return server_id, None
+            
+        # Create or update container
+        if container is None:
+            if self.create_container(server_id, config):
+                return server_id, "created"
+        else:
+            # Container exists, check if config has changed
+            # For now, just restart the container (in future could check for config changes)
+            if self.restart_container(server_id, container):
+                return server_id, "updated"
+        return server_id, None
+
+    def _remove_orphan(self, container: Any) -> Tuple[str, str]:
+        """Remove a managed container that no configured server uses.
+        
+        Args:
+            container: The orphaned container
+            
+        Returns:
+            Tuple of (container name, results key)
+        """
+        # Force removal kills the container right away instead of waiting out a stop timeout
+        container.remove(force=True, v=False)
+        return container.name, "stopped"
+
     def sync_containers(self) -> Dict[str, Any]:
         """Synchronize containers with the MCP server configuration.
         
@@ -322,49 +503,42 @@ class ContainerManager:
             # Get MCP server configurations
             mcp_servers = self.config_manager.get_mcp_servers()
             
-            # Track existing containers
-            existing_containers = []
+            # List the managed containers once instead of looking each one up
+            existing_containers = {
+                container.name: container
+                for container in self.client.containers.list(all=True, filters={"label": "managed_by=mcp-orchestrator"})
+            }
             
-            # Process each MCP server
-            for server_id, config in mcp_servers.items():
-                try:
-                    container_name = self._get_container_name(server_id)
-                    existing_containers.append(container_name)
+            # Containers that no configured server accounts for are orphans
+            container_names = {server_id: self._get_container_name(server_id) for server_id in mcp_servers}
+            orphaned_containers = existing_containers.keys() - set(container_names.values())
+            
+            # Process the MCP servers and remove the orphans concurrently, each task only touches its own container
+            task_count = len(mcp_servers) + len(orphaned_containers)
+            if task_count:
+                with ThreadPoolExecutor(max_workers=min(SYNC_MAX_WORKERS, task_count)) as executor:
+                    futures = {}
+                    for server_id, config in mcp_servers.items():
+                        future = executor.submit(self._reconcile_one, server_id, config,
+                                                 existing_containers.get(container_names[server_id]))
+                        futures[future] = server_id
+                    for container_name in orphaned_containers:
+                        logger.info(f"Found orphaned container {container_name}, removing")
+                        future = executor.submit(self._remove_orphan, existing_containers[container_name])
+                        futures[future] = None
                     
-                    if config.get("disabled", False):
-                        # Server is disabled, stop container if it exists
-                        if self._container_exists(container_name):
-                            self.stop_container(server_id)
-                            results["stopped"].append(server_id)
-                        continue
-                        
-                    # Create or update container
-                    if not self._container_exists(container_name):
-                        if self.create_container(server_id, config):
-                            results["created"].append(server_id)
-                    else:
-                        # Container exists, check if config has changed
-                        # For now, just restart the container (in future could check for config changes)
-                        if self.restart_container(server_id):
-                            results["updated"].append(server_id)
-                
-                except Exception as e:
-                    logger.error(f"Error processing server {server_id}: {str(e)}")
-                    results["errors"].append(f"{server_id}: {str(e)}")
-            
-            # Find and remove orphaned containers
-            try:
-                all_containers = self.client.containers.list(all=True, filters={"label": "managed_by=mcp-orchestrator"})
-                
-                for container in all_containers:
-                    if container.name not in existing_containers:
-                        logger.info(f"Found orphaned container {container.name}, removing")
-                        container.stop(timeout=10)
-                        container.remove()
-                        results["stopped"].append(container.name)
-                        
-            except Exception as e:
-                logger.error(f"Error cleaning up orphaned containers: {str(e)}")
+                    for future in as_completed(futures):
+                        server_id = futures[future]
+                        try:
+                            name, result_key = future.result()
+                            if result_key:
+                                results[result_key].append(name)
+                        except Exception as e:
+                            if server_id is None:
+                                logger.error(f"Error cleaning up orphaned containers: {str(e)}")
+                                continue
+                            logger.error(f"Error processing server {server_id}: {str(e)}")
+                            results["errors"].append(f"{server_id}: {str(e)}")
             
             logger.info(f"Container sync complete: {len(results['created'])} created, {len(results['updated'])} updated, {len(results['stopped'])} stopped")
             return results
@@ -385,9 +559,28 @@ class ContainerManager:
         # Get MCP server configurations
         mcp_servers = self.config_manager.get_mcp_servers()
         
+        # One listing call; its summaries carry all we show, so no container is inspected
+        try:
+            by_name = {
+                name.lstrip("/"): summary
+                for summary in self.api.containers(all=True, filters={"label": "managed_by=mcp-orchestrator"})
+                for name in summary.get("Names") or []
+            }
+        except Exception as e:
+            logger.error(f"Failed to list containers: {str(e)}")
+            return {server_id: {"exists": False, "error": str(e)} for server_id in mcp_servers}
+        
         # Get info for each server
         for server_id in mcp_servers.keys():
-            info[server_id] = self.get_container_info(server_id)
+            summary = by_name.get(self._get_container_name(server_id))
+            if summary is None:
+                info[server_id] = {"exists": False}
+                continue
+            try:
+                info[server_id] = self._container_info_from_summary(server_id, summary)
+            except Exception as e:
+                logger.error(f"Failed to get container info for {server_id}: {str(e)}")
+                info[server_id] = {"exists": False, "error": str(e)}
             
         return info
 
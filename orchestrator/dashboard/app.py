@@ -4,10 +4,20 @@ import os
 import flask
 from flask import (
     Flask, Blueprint, render_template, redirect, url_for,
-    request, flash, jsonify, current_app, g, send_from_directory
+    request, flash, jsonify, current_app, g, send_from_directory, session
 )
 import subprocess
 import datetime
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Serve the dashboard with waitress when it is installed
+try:
+    from waitress import serve
+except ImportError:
+    serve = None
 
 from orchestrator.utils.logging import setup_logging
 from orchestrator.config_manager import ConfigManager
@@ -19,17 +29,47 @@ from orchestrator.dashboard.auth import bp as auth_bp, login_required, init_auth
 # Set up logger
 logger = setup_logging(__name__)
 
+# Seconds the container information shown by the dashboard pages is reused for
+DASHBOARD_CACHE_TTL = 30
+
+# Worker threads handling dashboard requests when served by waitress
+DASHBOARD_THREADS = 8
+
+# Worker threads setting up ALB routing after a container was started from the dashboard
+ALB_SETUP_WORKERS = 4
+
+# Pages rendered only from the dashboard state snapshot, which are served with an ETag
+CONDITIONAL_ENDPOINTS = frozenset({'dashboard.index', 'dashboard.containers', 'dashboard.alb'})
+
+# Label, result set and key of each list of names reported after a synchronization
+SYNC_RESULT_SECTIONS = (
+    ("Created containers", 'container', 'created'),
+    ("Updated containers", 'container', 'updated'),
+    ("Stopped containers", 'container', 'stopped'),
+    ("Container errors", 'container', 'errors'),
+    ("Created ALB rules", 'alb', 'created'),
+    ("Updated ALB rules", 'alb', 'updated'),
+    ("Deleted ALB rules", 'alb', 'deleted'),
+    ("ALB errors", 'alb', 'errors'),
+)
+
 # Create blueprint
 bp = Blueprint('dashboard', __name__)
 
+# Managers used by the dashboard views, bound by create_app
+config_manager = None
+container_manager = None
+alb_manager = None
+
 # App factory
-def create_app(config_manager, container_manager, alb_manager):
+def create_app(config_manager, container_manager, alb_manager, dashboard_cache=None):
     """Create Flask application.
     
     Args:
         config_manager: The configuration manager instance
         container_manager: The container manager instance
         alb_manager: The ALB manager instance
+        dashboard_cache: Cache the dashboard state is published to, a new one if None
     
     Returns:
         Flask application
@@ -45,10 +85,14 @@ def create_app(config_manager, container_manager, alb_manager):
     init_auth(config_manager)
     app.register_blueprint(auth_bp)
     
-    # Store managers
-    app.config['config_manager'] = config_manager
-    app.config['container_manager'] = container_manager
-    app.config['alb_manager'] = alb_manager
+    # Managers don't change at runtime, so the views use them as module globals
+    _bind_managers(config_manager, container_manager, alb_manager)
+    app.jinja_env.globals['config_manager'] = config_manager
+    app.config['alb_executor'] = ThreadPoolExecutor(max_workers=ALB_SETUP_WORKERS,
+                                                    thread_name_prefix='alb-setup')
+    
+    # Container information and stats shared by the dashboard pages
+    app.config['dashboard_cache'] = dashboard_cache if dashboard_cache is not None else new_dashboard_cache()
     
     # Register dashboard blueprint
     app.register_blueprint(bp)
@@ -64,24 +108,176 @@ def create_app(config_manager, container_manager, alb_manager):
     
     return app
 
+def _bind_managers(config, containers, alb):
+    """Make the managers available to the dashboard views.
+    
+    Args:
+        config: The configuration manager instance
+        containers: The container manager instance
+        alb: The ALB manager instance
+    """
+    global config_manager, container_manager, alb_manager
+    config_manager = config
+    container_manager = containers
+    alb_manager = alb
+
 @bp.before_request
 @login_required
-def before_request():
-    """Make sure managers are available to all requests."""
-    g.config_manager = current_app.config['config_manager']
-    g.container_manager = current_app.config['container_manager']
-    g.alb_manager = current_app.config['alb_manager']
+def require_login():
+    """Require a logged in user for all dashboard pages."""
+    return None
 
-@bp.route('/')
-@login_required
-def index():
-    """Dashboard index page."""
-    # Get container information
-    containers = g.container_manager.get_all_container_info()
+@bp.before_request
+def conditional_get():
+    """Answer 304 Not Modified when the client already has the current page."""
+    if request.method != 'GET' or request.endpoint not in CONDITIONAL_ENDPOINTS:
+        return None
+    # Pages showing pending flash messages must be rendered
+    if session.get('_flashes'):
+        return None
+    
+    _get_dashboard_state()
+    if request.if_none_match.contains(_dashboard_etag()):
+        response = current_app.response_class(status=304)
+        response.set_etag(_dashboard_etag())
+        return response
+    return None
+
+@bp.after_request
+def add_etag(response):
+    """Tag the snapshot pages with the version of the state they were rendered from."""
+    if (request.endpoint in CONDITIONAL_ENDPOINTS and response.status_code == 200
+            and 'dashboard_version' in g and not session.modified):
+        response.set_etag(_dashboard_etag())
+        # Let browsers keep the page, but always check it is still current
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _dashboard_etag():
+    """Get the ETag of a snapshot page for the current user.
+    
+    Returns:
+        ETag value
+    """
+    return f"{current_app.config['dashboard_cache']['boot']}-{g.dashboard_version}-{g.user}"
+
+def new_dashboard_cache():
+    """Create the structure the dashboard state snapshot is shared through.
+    
+    Snapshot versions restart at 0 in every process, so the page ETags also
+    carry a token that is different in each process.
+    
+    Returns:
+        Dictionary with a lock and the current snapshot
+    """
+    return {'lock': threading.Lock(), 'data': None, 'version': 0, 'pages': {}, 'boot': uuid.uuid4().hex}
+
+def publish_dashboard_state(cache, mcp_servers, containers, max_age=DASHBOARD_CACHE_TTL):
+    """Store a fresh snapshot of the state shown by the dashboard.
+    
+    Args:
+        cache: Dashboard cache created by new_dashboard_cache
+        mcp_servers: MCP server configurations
+        containers: Container information by server ID
+        max_age: Seconds the snapshot may be served for
+        
+    Returns:
+        The stored snapshot
+    """
+    data = {
+        'containers': containers,
+        'mcp_servers': mcp_servers,
+        'stats': _calculate_stats(mcp_servers, containers),
+        'expires_at': time.monotonic() + max_age
+    }
+    with cache['lock']:
+        # Every snapshot gets a new version, which the page ETags are derived from
+        cache['version'] += 1
+        data['version'] = cache['version']
+        cache['data'] = data
+        cache['pages'] = {}
+    return data
+
+def _get_dashboard_state():
+    """Get the container information, MCP servers and stats shown by the dashboard.
+    
+    The snapshot published by the reconciliation loop is served until it expires,
+    the configuration is reloaded or a dashboard action invalidates it. Otherwise
+    the state is fetched and kept for DASHBOARD_CACHE_TTL seconds.
+    
+    Returns:
+        Dictionary with containers, mcp_servers and stats
+    """
+    cache = current_app.config['dashboard_cache']
+    mcp_servers = config_manager.get_mcp_servers()
+    
+    with cache['lock']:
+        data = cache['data']
+    # get_mcp_servers returns a new dict whenever the configuration changed
+    if (data is None or data['mcp_servers'] is not mcp_servers
+            or time.monotonic() >= data['expires_at']):
+        data = publish_dashboard_state(cache, mcp_servers, container_manager.get_all_service_info())
+    
+    g.dashboard_version = data['version']
+    return data
+
+def _invalidate_dashboard_state():
+    """Make the next dashboard page fetch fresh container information."""
+    cache = current_app.config['dashboard_cache']
+    with cache['lock']:
+        cache['data'] = None
+        cache['pages'] = {}
+
+def _render_snapshot_page(template, **context):
+    """Render a page built from the dashboard state snapshot, reusing earlier renders.
+    
+    Args:
+        template: Template to render
+        **context: Template variables, taken from the current snapshot
+        
+    Returns:
+        Rendered page
+    """
+    # Pages showing pending flash messages are rendered every time
+    if session.get('_flashes'):
+        return render_template(template, **context)
+    
+    cache = current_app.config['dashboard_cache']
+    # The pages also show the user and link to the host they were requested on
+    key = (request.endpoint, g.dashboard_version, g.user, request.host)
+    with cache['lock']:
+        page = cache['pages'].get(key)
+    if page is None:
+        page = render_template(template, **context)
+        with cache['lock']:
+            if cache['data'] is not None and cache['data']['version'] == g.dashboard_version:
+                cache['pages'][key] = page
+    return page
+
+def _setup_alb_in_background(server_id):
+    """Set up ALB routing for a server without holding up the response.
+    
+    Args:
+        server_id: The MCP server ID
+    """
+    def log_failure(future):
+        if future.exception() is not None:
+            logger.error(f"Failed to set up ALB for {server_id}: {str(future.exception())}")
     
-    # Calculate stats
-    mcp_servers = g.config_manager.get_mcp_servers()
+    future = current_app.config['alb_executor'].submit(alb_manager.setup_alb_for_server, server_id)
+    future.add_done_callback(log_failure)
+    flash(f"ALB setup for {server_id} is in progress")
+
+def _calculate_stats(mcp_servers, containers):
+    """Count the running, stopped and disabled MCP servers.
     
+    Args:
+        mcp_servers: MCP server configurations
+        containers: Container information by server ID
+        
+    Returns:
+        Dictionary with server counts
+    """
     stats = {
         'total': len(mcp_servers),
         'running': 0,
@@ -101,35 +297,47 @@ def index():
             else:
                 stats['stopped'] += 1
                 
-    return render_template('dashboard/index.html', 
-                          containers=containers, 
-                          container_stats=stats)
+    return stats
+
+@bp.route('/')
+def index():
+    """Dashboard index page."""
+    # Get container information and stats
+    state = _get_dashboard_state()
+    
+    return _render_snapshot_page('dashboard/index.html', 
+                          containers=state['containers'], 
+                          container_stats=state['stats'])
 
 @bp.route('/containers')
-@login_required
 def containers():
     """Container details page."""
-    # Get container information
-    containers = g.container_manager.get_all_container_info()
-    
-    # Get MCP server configurations
-    mcp_servers = g.config_manager.get_mcp_servers()
+    # Get container information and MCP server configurations
+    state = _get_dashboard_state()
     
-    return render_template('dashboard/containers.html', 
-                          containers=containers,
-                          mcp_servers=mcp_servers)
+    return _render_snapshot_page('dashboard/containers.html', 
+                          containers=state['containers'],
+                          mcp_servers=state['mcp_servers'])
 
 @bp.route('/alb')
-@login_required
 def alb():
     """ALB configuration page."""
     # Get container information with port allocations
-    containers = g.container_manager.get_all_container_info()
+    state = _get_dashboard_state()
     
-    return render_template('dashboard/alb.html', containers=containers)
+    return _render_snapshot_page('dashboard/alb.html', containers=state['containers'])
+
+@bp.route('/api/state')
+def api_state():
+    """Container information and stats of the current snapshot as JSON."""
+    state = _get_dashboard_state()
+    
+    # Server configurations are left out, their environment may hold secrets
+    response = jsonify(version=state['version'], containers=state['containers'], stats=state['stats'])
+    response.headers['Cache-Control'] = 'private, max-age=5'
+    return response
 
 @bp.route('/logs')
-@login_required
 def logs():
     """Logs page."""
     # Get recent logs (dummy implementation for now)
@@ -138,32 +346,33 @@ def logs():
     return render_template('dashboard/logs.html', logs=logs)
 
 @bp.route('/container/<server_id>/start')
-@login_required
 def start_container(server_id):
     """Start a container."""
     # Get server config
-    server_config = g.config_manager.get_mcp_server(server_id)
+    server_config = config_manager.get_mcp_server(server_id)
     if not server_config:
         flash(f"Server {server_id} not found in configuration")
         return redirect(url_for('dashboard.index'))
     
     # Create container
-    container_id = g.container_manager.create_container(server_id, server_config)
+    container_id = container_manager.create_container(server_id, server_config)
+    _invalidate_dashboard_state()
     if container_id:
         flash(f"Container for {server_id} started successfully")
         
         # Set up ALB after container starts
-        g.alb_manager.setup_alb_for_server(server_id)
+        _setup_alb_in_background(server_id)
     else:
         flash(f"Failed to start container for {server_id}")
     
     return redirect(url_for('dashboard.index'))
 
 @bp.route('/container/<server_id>/stop')
-@login_required
 def stop_container(server_id):
     """Stop a container."""
-    if g.container_manager.stop_container(server_id):
+    stopped = container_manager.stop_container(server_id)
+    _invalidate_dashboard_state()
+    if stopped:
         flash(f"Container for {server_id} stopped successfully")
     else:
         flash(f"Failed to stop container for {server_id}")
@@ -171,10 +380,11 @@ def stop_container(server_id):
     return redirect(url_for('dashboard.index'))
 
 @bp.route('/container/<server_id>/restart')
-@login_required
 def restart_container(server_id):
     """Restart a container."""
-    if g.container_manager.restart_container(server_id):
+    restarted = container_manager.restart_container(server_id)
+    _invalidate_dashboard_state()
+    if restarted:
         flash(f"Container for {server_id} restarted successfully")
     else:
         flash(f"Failed to restart container for {server_id}")
@@ -182,63 +392,41 @@ def restart_container(server_id):
     return redirect(url_for('dashboard.index'))
 
 @bp.route('/container/<server_id>/create')
-@login_required
 def create_container(server_id):
     """Create a container."""
     # Get server config
-    server_config = g.config_manager.get_mcp_server(server_id)
+    server_config = config_manager.get_mcp_server(server_id)
     if not server_config:
         flash(f"Server {server_id} not found in configuration")
         return redirect(url_for('dashboard.index'))
     
     # Create container
-    container_id = g.container_manager.create_container(server_id, server_config)
+    container_id = container_manager.create_container(server_id, server_config)
+    _invalidate_dashboard_state()
     if container_id:
         flash(f"Container for {server_id} created successfully")
         
         # Set up ALB after container is created
-        g.alb_manager.setup_alb_for_server(server_id)
+        _setup_alb_in_background(server_id)
     else:
         flash(f"Failed to create container for {server_id}")
     
     return redirect(url_for('dashboard.index'))
 
 @bp.route('/sync')
-@login_required
 def sync():
     """Synchronize containers and ALB with configuration."""
     # Sync containers
-    container_results = g.container_manager.sync_containers()
+    container_results = container_manager.sync_containers()
+    _invalidate_dashboard_state()
     
     # Sync ALB rules
-    alb_results = g.alb_manager.sync_alb()
+    alb_results = alb_manager.sync_alb()
     
     # Display results
-    flash_messages = []
-    
-    if container_results['created']:
-        flash_messages.append(f"Created containers: {', '.join(container_results['created'])}")
-    
-    if container_results['updated']:
-        flash_messages.append(f"Updated containers: {', '.join(container_results['updated'])}")
-    
-    if container_results['stopped']:
-        flash_messages.append(f"Stopped containers: {', '.join(container_results['stopped'])}")
-    
-    if container_results['errors']:
-        flash_messages.append(f"Container errors: {', '.join(container_results['errors'])}")
-    
-    if alb_results['created']:
-        flash_messages.append(f"Created ALB rules: {', '.join(alb_results['created'])}")
-    
-    if alb_results['updated']:
-        flash_messages.append(f"Updated ALB rules: {', '.join(alb_results['updated'])}")
-    
-    if alb_results['deleted']:
-        flash_messages.append(f"Deleted ALB rules: {', '.join(alb_results['deleted'])}")
-    
-    if alb_results['errors']:
-        flash_messages.append(f"ALB errors: {', '.join(alb_results['errors'])}")
+    results = {'container': container_results, 'alb': alb_results}
+    flash_messages = [f"{label}: {', '.join(results[source][key])}"
+                      for label, source, key in SYNC_RESULT_SECTIONS if results[source][key]]
     
     if not flash_messages:
         flash("Synchronization completed. No changes were needed.")
@@ -248,7 +436,8 @@ def sync():
     
     return redirect(url_for('dashboard.index'))
 
-def run_dashboard(config_manager, container_manager, alb_manager, host='0.0.0.0', port=5000, debug=False):
+def run_dashboard(config_manager, container_manager, alb_manager, host='0.0.0.0', port=5000, debug=False,
+                  dashboard_cache=None):
     """Run the dashboard application.
     
     Args:
@@ -258,6 +447,12 @@ def run_dashboard(config_manager, container_manager, alb_manager, host='0.0.0.0'
         host: Host to bind to
         port: Port to bind to
         debug: Whether to run in debug mode
+        dashboard_cache: Cache the dashboard state is published to, a new one if None
     """
-    app = create_app(config_manager, container_manager, alb_manager)
-    app.run(host=host, port=port, debug=debug)
+    app = create_app(config_manager, container_manager, alb_manager, dashboard_cache)
+    if serve is not None and not debug:
+        # poll() instead of select() keeps many open polling clients from hitting FD_SETSIZE
+        serve(app, host=host, port=port, threads=DASHBOARD_THREADS, asyncore_use_poll=True)
+    else:
+        # Each request gets its own thread, so slow Docker or AWS calls don't hold up other tabs
+        app.run(host=host, port=port, debug=debug, threaded=True)
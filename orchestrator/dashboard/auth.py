@@ -1,6 +1,7 @@
 """Authentication module for the MCP Orchestrator dashboard."""
 
 import functools
+import hmac
 from flask import (
     Blueprint, flash, g, redirect, render_template, request, session, url_for
 )
@@ -12,6 +13,9 @@ from orchestrator.config_manager import ConfigManager
 # Set up logger
 logger = setup_logging(__name__)
 
+# Prefixes of werkzeug password hashes, a configured password starting with one is used as its hash
+PASSWORD_HASH_PREFIXES = ("pbkdf2:", "scrypt:")
+
 # Create blueprint
 bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -23,6 +27,27 @@ def init_auth(config_manager):
     """
     # Store config manager in the blueprint
     bp.config_manager = config_manager
+    
+    # Hash of the configured password, and the configured value it was made from
+    bp.password_hash = None
+    bp.password_hash_source = None
+    _get_password_hash()
+
+def _get_password_hash():
+    """Get the hash of the configured dashboard password.
+    
+    A plaintext password is hashed once, and again only when the setting changes.
+    
+    Returns:
+        werkzeug password hash
+    """
+    config_password = bp.config_manager.get_setting('dashboard', 'password', 'changeme')
+    if config_password.startswith(PASSWORD_HASH_PREFIXES):
+        return config_password
+    if bp.password_hash_source != config_password:
+        bp.password_hash = generate_password_hash(config_password)
+        bp.password_hash_source = config_password
+    return bp.password_hash
 
 def login_required(view):
     """View decorator that redirects anonymous users to the login page."""
@@ -50,21 +75,24 @@ def login():
         password = request.form.get('password')
         error = None
 
-        # Get configured username and password
+        # Get configured username
         config_username = bp.config_manager.get_setting('dashboard', 'username', 'admin')
-        config_password = bp.config_manager.get_setting('dashboard', 'password', 'changeme')
 
         if not username:
             error = 'Username is required.'
         elif not password:
             error = 'Password is required.'
-        elif username != config_username or password != config_password:
+        # Compare in constant time, so response times don't reveal the credentials
+        elif not (hmac.compare_digest(username.encode(), config_username.encode())
+                  & check_password_hash(_get_password_hash(), password)):
             error = 'Incorrect username or password.'
 
         if error is None:
             # Store the user's id in the session
             session.clear()
             session['user_id'] = username
+            # Keep the login for PERMANENT_SESSION_LIFETIME instead of until the browser closes
+            session.permanent = True
             logger.info(f"User {username} logged in")
             return redirect(url_for('dashboard.index'))
 
@@ -3,7 +3,6 @@
 
 import os
 import sys
-import time
 import signal
 import threading
 import argparse
@@ -13,21 +12,20 @@ from orchestrator.utils.logging import setup_logging
 from orchestrator.config_manager import ConfigManager
 from orchestrator.compose_manager import ComposeManager
 from orchestrator.alb_manager import ALBManager
-from orchestrator.dashboard.app import run_dashboard
+from orchestrator.dashboard.app import run_dashboard, new_dashboard_cache, publish_dashboard_state
 
 # Remove the container_manager import as we use compose_manager instead
 
 # Set up logger
 logger = setup_logging("mcp-orchestrator", level=logging.INFO)
 
-# Global flag for graceful shutdown
-shutdown_requested = False
+# Set to request a graceful shutdown, also wakes the reconciliation loop
+shutdown_event = threading.Event()
 
 def signal_handler(sig, frame):
     """Handle termination signals."""
-    global shutdown_requested
     logger.info(f"Received signal {sig}, initiating graceful shutdown")
-    shutdown_requested = True
+    shutdown_event.set()
 
 def parse_args():
     """Parse command line arguments."""
@@ -62,7 +60,7 @@ Examples:
     parser.add_argument('--version', action='version', version='MCP Docker Orchestrator v1.0.0')
     return parser.parse_args()
 
-def reconciliation_loop(config_manager, compose_manager, alb_manager, interval=60):
+def reconciliation_loop(config_manager, compose_manager, alb_manager, interval=60, dashboard_cache=None):
     """Run the reconciliation loop to keep resources in sync.
     
     Args:
@@ -70,10 +68,9 @@ def reconciliation_loop(config_manager, compose_manager, alb_manager, interval=6
         compose_manager: The Docker Compose manager instance
         alb_manager: The ALB manager instance
         interval: Sleep interval between reconciliation cycles
+        dashboard_cache: Dashboard cache to publish the reconciled state to, if any
     """
-    global shutdown_requested
-    
-    while not shutdown_requested:
+    while not shutdown_event.is_set():
         try:
             # Reload configuration
             config_manager.load_config()
@@ -100,6 +97,11 @@ def reconciliation_loop(config_manager, compose_manager, alb_manager, interval=6
             if alb_results['errors']:
                 logger.error(f"ALB sync errors: {alb_results['errors']}")
                 
+            # Publish the reconciled state, so dashboard pages don't query Docker themselves
+            if dashboard_cache is not None:
+                publish_dashboard_state(dashboard_cache, config_manager.get_mcp_servers(),
+                                        compose_manager.get_all_service_info(), max_age=2 * interval)
+                
         except Exception as e:
             logger.error(f"Error in reconciliation loop: {str(e)}", exc_info=True)
             
@@ -108,13 +110,11 @@ def reconciliation_loop(config_manager, compose_manager, alb_manager, interval=6
             logger.info("One-shot run complete, exiting")
             break
             
-        # Sleep until next reconciliation cycle
-        for _ in range(interval):
-            if shutdown_requested:
-                break
-            time.sleep(1)
+        # Sleep until next reconciliation cycle, or until shutdown is requested
+        if shutdown_event.wait(interval):
+            break
 
-def run_dashboard_thread(config_manager, compose_manager, alb_manager, port=5000):
+def run_dashboard_thread(config_manager, compose_manager, alb_manager, port=5000, dashboard_cache=None):
     """Run the dashboard in a separate thread.
     
     Args:
@@ -122,6 +122,7 @@ def run_dashboard_thread(config_manager, compose_manager, alb_manager, port=5000
         compose_manager: The Docker Compose manager instance
         alb_manager: The ALB manager instance
         port: Port for web dashboard
+        dashboard_cache: Cache the reconciliation loop publishes the dashboard state to
     """
     try:
         logger.info(f"Starting dashboard on port {port}")
@@ -129,7 +130,8 @@ def run_dashboard_thread(config_manager, compose_manager, alb_manager, port=5000
             config_manager=config_manager,
             container_manager=compose_manager,  # Dashboard code will use container_manager interface
             alb_manager=alb_manager,
-            port=port
+            port=port,
+            dashboard_cache=dashboard_cache
         )
     except Exception as e:
         logger.error(f"Dashboard error: {str(e)}", exc_info=True)
@@ -155,21 +157,27 @@ def main():
         compose_manager = ComposeManager(config_manager)
         alb_manager = ALBManager(config_manager, compose_manager)
         
+        # Keep the cached container state current between reconciliation cycles
+        if not args.one_shot:
+            compose_manager.start_event_listener()
+        
         # Start dashboard in a separate thread if enabled
         dashboard_thread = None
+        dashboard_cache = None
         if not args.no_dashboard:
+            dashboard_cache = new_dashboard_cache()
             dashboard_thread = threading.Thread(
                 target=run_dashboard_thread,
-                args=(config_manager, compose_manager, alb_manager, args.dashboard_port),
+                args=(config_manager, compose_manager, alb_manager, args.dashboard_port, dashboard_cache),
                 daemon=True
             )
             dashboard_thread.start()
         
         # Run reconciliation loop
-        interval = 0 if args.one_shot else int(config_manager.get_setting(
+        interval = 0 if args.one_shot else config_manager.get_setting(
             "service", "reconciliation_interval_seconds", 60
-        ))
-        reconciliation_loop(config_manager, compose_manager, alb_manager, interval)
+        )
+        reconciliation_loop(config_manager, compose_manager, alb_manager, interval, dashboard_cache)
         
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}", exc_info=True)
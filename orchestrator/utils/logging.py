@@ -1,9 +1,27 @@
 """Logging utilities for MCP Docker Orchestrator."""
 
+import atexit
 import json
 import logging
+import logging.handlers
+import queue
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+
+# Use orjson for encoding log records when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Standard LogRecord attributes, everything else on a record is logged as an extra field
+_RECORD_ATTRIBUTES = frozenset({
+    "args", "asctime", "created", "exc_info", "exc_text",
+    "filename", "funcName", "id", "levelname", "levelno",
+    "lineno", "module", "msecs", "message", "msg",
+    "name", "pathname", "process", "processName",
+    "relativeCreated", "stack_info", "thread", "threadName"
+})
 
 class JsonFormatter(logging.Formatter):
     """Format logs as JSON objects."""
@@ -11,21 +29,18 @@ class JsonFormatter(logging.Formatter):
     def format(self, record):
         """Format log record as JSON."""
         log_object = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat().replace("+00:00", "Z"),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
             "function": record.funcName,
         }
 
-        # Add any extra attributes
-        for key, value in record.__dict__.items():
-            if key not in ["args", "asctime", "created", "exc_info", "exc_text", 
-                          "filename", "funcName", "id", "levelname", "levelno", 
-                          "lineno", "module", "msecs", "message", "msg", 
-                          "name", "pathname", "process", "processName", 
-                          "relativeCreated", "stack_info", "thread", "threadName"]:
-                log_object[key] = value
+        # Add any extra attributes, a set difference tells cheaply whether there are any
+        if record.__dict__.keys() - _RECORD_ATTRIBUTES:
+            for key, value in record.__dict__.items():
+                if key not in _RECORD_ATTRIBUTES:
+                    log_object[key] = value
 
         # Add exception info if available
         if record.exc_info:
@@ -34,20 +49,56 @@ class JsonFormatter(logging.Formatter):
                 "message": str(record.exc_info[1]),
             }
 
+        if orjson is not None:
+            return orjson.dumps(log_object).decode()
         return json.dumps(log_object)
 
 
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """Queue log records for the console writer thread."""
+
+    def prepare(self, record):
+        """Resolve the message now, but keep exc_info for the JsonFormatter."""
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Records from all loggers are formatted and written by one background thread
+_log_queue = None
+_log_listener = None
+
+
+def _get_log_queue():
+    """Get the queue of the console writer thread, starting the thread on first use."""
+    global _log_queue, _log_listener
+    if _log_queue is None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(JsonFormatter())
+        _log_queue = queue.SimpleQueue()
+        _log_listener = logging.handlers.QueueListener(_log_queue, console_handler)
+        _log_listener.start()
+        # Write out the queued records before the process exits
+        atexit.register(_log_listener.stop)
+    return _log_queue
+
+
 def setup_logging(name="mcp-orchestrator", level=logging.INFO):
     """Set up structured logging for the application."""
     logger = logging.getLogger(name)
     logger.setLevel(level)
+    # Records are written by this logger's own handler only
+    logger.propagate = False
+
+    # A logger set up before already has its handler, another one would write every record twice
+    if logger.handlers:
+        return logger
 
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(JsonFormatter())
+    # Hand records to the console writer thread, so logging never blocks on stdout
+    queue_handler = RecordQueueHandler(_get_log_queue())
+    queue_handler.setLevel(level)
 
     # Add handler to logger
-    logger.addHandler(console_handler)
+    logger.addHandler(queue_handler)
 
     return logger
@@ -4,11 +4,15 @@ Test script to validate all required dependencies for MCP Orchestrator.
 This script checks if all necessary Python modules are installed and accessible.
 """
 
-import importlib
+import functools
+import importlib.util
 import sys
-import subprocess
+import shutil
 import os
+import io
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # ANSI colors for prettier output
 GREEN = '\033[92m'
@@ -39,6 +43,12 @@ SYSTEM_DEPENDENCIES = [
     'python3'        # Python 3
 ]
 
+# Stop checking a list at its first failure instead of reporting every entry
+FAST_CHECK = bool(os.environ.get('MCP_FAST_CHECK'))
+
+# Create a Flask app in the Flask check instead of only looking the module up
+DEEP_CHECK = bool(os.environ.get('MCP_DEEP_CHECK'))
+
 
 def print_header(message):
     """Print a formatted header message."""
@@ -48,35 +58,54 @@ def print_header(message):
 
 
 def check_python_module(module_name):
-    """Check if a Python module can be imported."""
+    """Check if a Python module is installed, without importing it."""
     try:
-        importlib.import_module(module_name)
+        installed = importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        installed = False
+    
+    if installed:
         print(f"{GREEN}✓ Module '{module_name}' is installed.{ENDC}")
-        return True
-    except ImportError as e:
-        print(f"{RED}✗ Module '{module_name}' is NOT installed: {e}{ENDC}")
-        return False
+    else:
+        print(f"{RED}✗ Module '{module_name}' is NOT installed.{ENDC}")
+    return installed
 
 
 def check_system_dependency(dependency):
     """Check if a system dependency is available in PATH."""
-    try:
-        subprocess.run(['which', dependency], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if shutil.which(dependency) is not None:
         print(f"{GREEN}✓ System dependency '{dependency}' is available.{ENDC}")
         return True
-    except subprocess.CalledProcessError:
-        print(f"{RED}✗ System dependency '{dependency}' is NOT available in PATH.{ENDC}")
-        return False
+    print(f"{RED}✗ System dependency '{dependency}' is NOT available in PATH.{ENDC}")
+    return False
+
+
+def check_all(check, items):
+    """Run a check for every item, stopping at the first failure with MCP_FAST_CHECK set."""
+    if FAST_CHECK:
+        return all(check(item) for item in items)
+    return all([check(item) for item in items])
+
+
+@functools.lru_cache(maxsize=1)
+def get_docker_client():
+    """Get the Docker client, connecting on first use."""
+    import docker
+    return docker.from_env()
+
+
+@functools.lru_cache(maxsize=1)
+def get_boto_session():
+    """Get the boto3 session, creating it on first use."""
+    import boto3
+    return boto3.Session()
 
 
 def check_docker_functionality():
     """Test Docker functionality by listing containers."""
     try:
-        # Try to import the Docker module
-        import docker
-        
-        # Try to connect to Docker daemon
-        client = docker.from_env()
+        # Import the Docker module and connect to the Docker daemon
+        client = get_docker_client()
         client.ping()  # Test connection
         
         # List containers as a simple test
@@ -94,36 +123,40 @@ def check_docker_functionality():
 def check_aws_functionality():
     """Test AWS functionality by checking credentials."""
     try:
-        # Try to import the boto3 module
-        import boto3
-        
-        # Check for AWS credentials
-        session = boto3.Session()
-        credentials = session.get_credentials()
-        
-        if credentials is None:
-            print(f"{YELLOW}⚠ AWS credentials not found or not configured.{ENDC}")
-            print(f"{YELLOW}  To configure AWS credentials, run 'aws configure' or set up environment variables.{ENDC}")
-            return False
-        
-        # Try to get the account ID as a simple test
-        try:
-            sts = session.client('sts')
-            account_id = sts.get_caller_identity().get('Account')
-            print(f"{GREEN}✓ AWS API connection successful. Account ID: {account_id}{ENDC}")
-            return True
-        except Exception as e:
-            print(f"{YELLOW}⚠ AWS API connection test failed: {e}{ENDC}")
-            print(f"{YELLOW}  This may be due to missing credentials or permissions.{ENDC}")
-            return False
-            
+        # Import the boto3 module, the STS call below resolves the AWS credentials
+        session = get_boto_session()
+        from botocore.config import Config
+        from botocore.exceptions import NoCredentialsError
     except ImportError:
         print(f"{RED}✗ Boto3 Python module not installed.{ENDC}")
         return False
+    
+    # Try to get the account ID as a simple test, failing fast without a reachable endpoint
+    try:
+        sts = session.client('sts', config=Config(connect_timeout=2, read_timeout=2,
+                                                   retries={'max_attempts': 1}))
+        account_id = sts.get_caller_identity().get('Account')
+        print(f"{GREEN}✓ AWS API connection successful. Account ID: {account_id}{ENDC}")
+        return True
+    except NoCredentialsError:
+        print(f"{YELLOW}⚠ AWS credentials not found or not configured.{ENDC}")
+        print(f"{YELLOW}  To configure AWS credentials, run 'aws configure' or set up environment variables.{ENDC}")
+        return False
+    except Exception as e:
+        print(f"{YELLOW}⚠ AWS API connection test failed: {e}{ENDC}")
+        print(f"{YELLOW}  This may be due to missing credentials or permissions.{ENDC}")
+        return False
 
 
 def check_flask_functionality():
-    """Test Flask functionality by creating a simple app."""
+    """Test that Flask is installed, creating a simple app with MCP_DEEP_CHECK set."""
+    if not DEEP_CHECK:
+        if importlib.util.find_spec('flask') is None:
+            print(f"{RED}✗ Flask Python module not installed.{ENDC}")
+            return False
+        print(f"{GREEN}✓ Flask is installed.{ENDC}")
+        return True
+    
     try:
         # Try to import Flask
         from flask import Flask
@@ -150,7 +183,11 @@ def check_config_files(config_files=["settings.conf", "mcp-compose.yaml"]):
     results = {}
     
     for config_file in config_files:
-        if not os.path.exists(config_file):
+        # Opening the file tells whether it exists, its content is then validated from memory
+        try:
+            with open(config_file) as f:
+                data = f.read()
+        except FileNotFoundError:
             print(f"{YELLOW}⚠ Config file '{config_file}' not found.{ENDC}")
             results[config_file] = False
             continue
@@ -158,8 +195,7 @@ def check_config_files(config_files=["settings.conf", "mcp-compose.yaml"]):
         # Check file format
         if config_file.endswith('.json'):
             try:
-                with open(config_file) as f:
-                    json.load(f)
+                json.loads(data)
                 print(f"{GREEN}✓ JSON config file '{config_file}' is valid.{ENDC}")
                 results[config_file] = True
             except json.JSONDecodeError as e:
@@ -168,8 +204,7 @@ def check_config_files(config_files=["settings.conf", "mcp-compose.yaml"]):
         elif config_file.endswith('.yaml') or config_file.endswith('.yml'):
             try:
                 import yaml
-                with open(config_file) as f:
-                    yaml.safe_load(f)
+                yaml.safe_load(data)
                 print(f"{GREEN}✓ YAML config file '{config_file}' is valid.{ENDC}")
                 results[config_file] = True
             except yaml.YAMLError as e:
@@ -179,7 +214,7 @@ def check_config_files(config_files=["settings.conf", "mcp-compose.yaml"]):
             try:
                 import configparser
                 config = configparser.ConfigParser()
-                config.read(config_file)
+                config.read_string(data, source=config_file)
                 print(f"{GREEN}✓ Config file '{config_file}' is valid.{ENDC}")
                 results[config_file] = True
             except Exception as e:
@@ -198,10 +233,19 @@ def check_directory_structure():
         "orchestrator/utils"
     ]
     
+    # List each parent directory once instead of looking up every required directory
+    found = set()
+    for parent in {os.path.dirname(directory) for directory in required_dirs}:
+        try:
+            with os.scandir(parent or '.') as entries:
+                found.update(os.path.join(parent, entry.name) for entry in entries if entry.is_dir())
+        except OSError:
+            pass
+    
     all_exist = True
     
     for directory in required_dirs:
-        if os.path.exists(directory) and os.path.isdir(directory):
+        if directory in found:
             print(f"{GREEN}✓ Directory '{directory}' exists.{ENDC}")
         else:
             print(f"{RED}✗ Directory '{directory}' does not exist.{ENDC}")
@@ -210,6 +254,50 @@ def check_directory_structure():
     return all_exist
 
 
+# Output of the checks running in worker threads, kept per thread until main prints it
+_thread_output = threading.local()
+
+
+class ThreadOutput:
+    """Stand-in for sys.stdout that sends prints from check threads to their own buffer."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def write(self, text):
+        return getattr(_thread_output, 'buffer', self.stream).write(text)
+    
+    def flush(self):
+        getattr(_thread_output, 'buffer', self.stream).flush()
+
+
+def run_buffered(check):
+    """Run a check, returning its result and what it printed."""
+    _thread_output.buffer = io.StringIO()
+    try:
+        return check(), _thread_output.buffer.getvalue()
+    finally:
+        del _thread_output.buffer
+
+
+def run_in_parallel(checks):
+    """Run (header, check) pairs at the same time, printing their output in order."""
+    sys.stdout = ThreadOutput(sys.stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            futures = [executor.submit(run_buffered, check) for _, check in checks]
+            outcomes = [future.result() for future in futures]
+    finally:
+        sys.stdout = sys.stdout.stream
+    
+    results = []
+    for (header, _), (passed, output) in zip(checks, outcomes):
+        print_header(header)
+        print(output, end='')
+        results.append(passed)
+    return results
+
+
 def main():
     """Main function to run all tests."""
     print_header("MCP Orchestrator Dependency Test")
@@ -219,38 +307,24 @@ def main():
     
     # Check Python modules
     print_header("Checking Python Modules")
-    modules_passed = all([check_python_module(module) for module in REQUIRED_MODULES])
+    modules_passed = check_all(check_python_module, REQUIRED_MODULES)
     all_passed = all_passed and modules_passed
     
     # Check system dependencies
     print_header("Checking System Dependencies")
-    system_passed = all([check_system_dependency(dep) for dep in SYSTEM_DEPENDENCIES])
+    system_passed = check_all(check_system_dependency, SYSTEM_DEPENDENCIES)
     all_passed = all_passed and system_passed
     
-    # Check Docker functionality
-    print_header("Testing Docker Functionality")
-    docker_passed = check_docker_functionality()
-    all_passed = all_passed and docker_passed
-    
-    # Check AWS functionality
-    print_header("Testing AWS Functionality")
-    aws_passed = check_aws_functionality()
+    # The remaining checks are independent, the Docker and AWS ones wait on the network
+    docker_passed, aws_passed, flask_passed, config_passed, dir_passed = run_in_parallel([
+        ("Testing Docker Functionality", check_docker_functionality),
+        ("Testing AWS Functionality", check_aws_functionality),
+        ("Testing Flask Functionality", check_flask_functionality),
+        ("Checking Configuration Files", check_config_files),
+        ("Checking Directory Structure", check_directory_structure),
+    ])
     # Don't fail on AWS check as it might be running locally without AWS
-    
-    # Check Flask functionality
-    print_header("Testing Flask Functionality")
-    flask_passed = check_flask_functionality()
-    all_passed = all_passed and flask_passed
-    
-    # Check config files
-    print_header("Checking Configuration Files")
-    config_passed = check_config_files()
-    all_passed = all_passed and config_passed
-    
-    # Check directory structure
-    print_header("Checking Directory Structure")
-    dir_passed = check_directory_structure()
-    all_passed = all_passed and dir_passed
+    all_passed = all_passed and docker_passed and flask_passed and config_passed and dir_passed
     
     # Print summary
     print_header("Test Results Summary")
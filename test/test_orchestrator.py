@@ -5,40 +5,62 @@ This script tests components and their interactions to ensure they work correctl
 """
 
 import os
+import subprocess
 import sys
 import time
 import json
 import tempfile
+import types
 import unittest
 from unittest import mock
 
-# Add parent directory to path so we can import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import boto3
+import docker
+from botocore.exceptions import ClientError
+from docker.errors import APIError, DockerException, ImageNotFound, NotFound
+
+# Add parent directory to path so we can import our modules, once if this file is imported again
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PARENT_DIR not in sys.path:
+    sys.path.append(PARENT_DIR)
 
 # Import modules after path setup
+from orchestrator import alb_manager as alb_manager_module, compose_manager as compose_manager_module
+from orchestrator import container_manager as container_manager_module
 from orchestrator.utils.logging import setup_logging
-from orchestrator.config_manager import ConfigManager
-from orchestrator.compose_manager import ComposeManager
-from orchestrator.alb_manager import ALBManager
+from orchestrator.config_manager import ConfigManager, _parse_settings_file
+from orchestrator.dashboard import app as dashboard_app_module
+
+ComposeManager = compose_manager_module.ComposeManager
+ALBManager = alb_manager_module.ALBManager
+ContainerManager = container_manager_module.ContainerManager
+
+
+# Parts of the container attrs that the mock never changes, shared by all containers
+HEALTHY = {"Status": "healthy"}
+UNHEALTHY = {"Status": "unhealthy"}
+CONTAINER_CONFIG = {"Image": "test-image:latest"}
 
 
 class MockDockerContainer:
     """Mock Docker container for testing."""
     
+    __slots__ = ('id', 'name', 'status', 'attrs')
+    
     def __init__(self, container_id, name, status="running"):
         self.id = container_id
         self.name = name
         self.status = status
+        running = status == "running"
+        # Only the state changes, when the container is stopped or restarted
         self.attrs = {
             "State": {
                 "Status": status,
-                "Running": status == "running",
-                "Health": {"Status": "healthy"} if status == "running" else {"Status": "unhealthy"}
+                "Running": running,
+                "Health": HEALTHY if running else UNHEALTHY
             },
             "Created": "2025-06-22T12:00:00Z",
-            "Config": {
-                "Image": "test-image:latest"
-            }
+            "Config": CONTAINER_CONFIG
         }
     
     def stop(self, timeout=None):
@@ -60,6 +82,8 @@ class MockDockerContainer:
 class MockDockerClient:
     """Mock Docker client for testing."""
     
+    __slots__ = ('containers',)
+    
     def __init__(self):
         self.containers = MockContainerCollection()
     
@@ -70,76 +94,109 @@ class MockDockerClient:
 class MockContainerCollection:
     """Mock container collection for Docker client."""
     
+    __slots__ = ('_containers', '_all_containers')
+    
     def __init__(self):
         self._containers = {}
+        # Listing of all containers, kept until a container is added
+        self._all_containers = None
     
     def get(self, name):
-        if name in self._containers:
-            return self._containers[name]
-        raise Exception(f"Container {name} not found")
+        container = self._containers.get(name)
+        if container is None:
+            raise NotFound(f"Container {name} not found")
+        return container
     
     def run(self, image, **kwargs):
-        name = kwargs.get('name', f"container-{len(self._containers)}")
-        container = MockDockerContainer(
-            f"container-id-{len(self._containers)}",
-            name,
-            "running"
-        )
+        index = len(self._containers)
+        name = kwargs.get('name') or f"container-{index}"
+        container = MockDockerContainer(f"container-id-{index}", name, "running")
         self._containers[name] = container
+        self._all_containers = None
         return container
     
     def list(self, all=False, filters=None):
-        return list(self._containers.values())
+        if all and not filters:
+            if self._all_containers is None:
+                self._all_containers = tuple(self._containers.values())
+            return self._all_containers
+        # Like docker, only running containers are listed unless all is set
+        status = (filters or {}).get('status', None if all else 'running')
+        name = (filters or {}).get('name')
+        return tuple(
+            container for container in self._containers.values()
+            if (status is None or container.status == status) and (name is None or name in container.name)
+        )
+
+
+class MockPaginator:
+    """Mock boto3 paginator returning a single page."""
+    
+    def __init__(self, operation):
+        self.operation = operation
+    
+    def paginate(self, **kwargs):
+        yield self.operation(**kwargs)
+
+
+# Target group ARNs of the mock are these around the target group name
+TARGET_GROUP_ARN_PREFIX = "arn:aws:elasticloadbalancing:us-west-2:123456789012:targetgroup/"
+TARGET_GROUP_ARN_SUFFIX = "/abcdef1234567890"
+
+# Listener of the test ALB, which no test changes, shared read-only by all AWS mocks
+DEFAULT_LISTENERS = types.MappingProxyType({
+    "dummy-listener-arn": types.MappingProxyType({
+        "ListenerArn": "dummy-listener-arn",
+        "Port": 80,
+        "Protocol": "HTTP"
+    })
+})
 
 
 class MockAWSClient:
     """Mock AWS client for testing."""
     
+    __slots__ = ('target_groups', 'rules', 'tags', 'listeners')
+    
     def __init__(self):
         self.target_groups = {}
         self.rules = {}
-        self.listeners = {
-            "dummy-listener-arn": {
-                "ListenerArn": "dummy-listener-arn",
-                "Port": 80,
-                "Protocol": "HTTP"
-            }
-        }
+        self.tags = {}  # Maps resource ARN -> list of tags
+        self.listeners = DEFAULT_LISTENERS
     
     def describe_target_groups(self, Names=None):
-        if Names:
-            result = []
-            for name in Names:
-                if name in self.target_groups:
-                    result.append(self.target_groups[name])
-            if not result:
-                # Instead of raising an exception, return an empty list
-                # This matches the AWS boto3 behavior when no target groups are found
-                return {"TargetGroups": []}
-            return {"TargetGroups": result}
-        return {"TargetGroups": list(self.target_groups.values())}
-    
-    def create_target_group(self, **kwargs):
-        name = kwargs.get('Name')
+        if not Names:
+            return {"TargetGroups": list(self.target_groups.values())}
+        # Unknown names are left out instead of raising, an empty list means none were found
+        return {"TargetGroups": [self.target_groups[name] for name in dict.fromkeys(Names)
+                                 if name in self.target_groups]}
+    
+    def create_target_group(self, Name, Protocol='HTTP', Port=80, VpcId='vpc-1234567890abcdef',
+                            Tags=None, **kwargs):
         tg = {
-            "TargetGroupArn": f"arn:aws:elasticloadbalancing:us-west-2:123456789012:targetgroup/{name}/abcdef1234567890",
-            "TargetGroupName": name,
-            "Protocol": kwargs.get('Protocol', 'HTTP'),
-            "Port": kwargs.get('Port', 80),
-            "VpcId": kwargs.get('VpcId', 'vpc-1234567890abcdef')
+            "TargetGroupArn": TARGET_GROUP_ARN_PREFIX + Name + TARGET_GROUP_ARN_SUFFIX,
+            "TargetGroupName": Name,
+            "Protocol": Protocol,
+            "Port": Port,
+            "VpcId": VpcId
         }
-        self.target_groups[name] = tg
+        self.target_groups[Name] = tg
+        if Tags:
+            self.tags[tg["TargetGroupArn"]] = Tags
         return {"TargetGroups": [tg]}
     
+    def get_paginator(self, operation_name):
+        return MockPaginator(getattr(self, operation_name))
+    
     def describe_rules(self, ListenerArn=None):
         return {"Rules": list(self.rules.values())}
     
-    def create_rule(self, **kwargs):
+    def create_rule(self, Priority=1, Conditions=None, Actions=None, **kwargs):
         rule = {
             "RuleArn": f"rule-arn-{len(self.rules)}",
-            "Priority": kwargs.get('Priority', 1),
-            "Conditions": kwargs.get('Conditions', []),
-            "Actions": kwargs.get('Actions', [])
+            "Priority": Priority,
+            "Conditions": Conditions or [],
+            "Actions": Actions or []
         }
         self.rules[rule["RuleArn"]] = rule
         return {"Rules": [rule]}
@@ -151,29 +208,114 @@ class MockAWSClient:
             return {"Rules": [self.rules[rule_arn]]}
         raise Exception("Rule not found")
     
+    def delete_rule(self, **kwargs):
+        self.rules.pop(kwargs.get('RuleArn'), None)
+        return {}
+    
+    def delete_target_group(self, **kwargs):
+        arn = kwargs.get('TargetGroupArn')
+        for name, tg in list(self.target_groups.items()):
+            if tg['TargetGroupArn'] == arn:
+                del self.target_groups[name]
+        self.tags.pop(arn, None)
+        return {}
+    
     def register_targets(self, **kwargs):
         return {}
     
     def add_tags(self, **kwargs):
+        for arn in kwargs.get('ResourceArns', []):
+            self.tags.setdefault(arn, []).extend(kwargs.get('Tags', []))
         return {}
     
     def describe_tags(self, **kwargs):
-        return {"TagDescriptions": []}
+        return {"TagDescriptions": [
+            {"ResourceArn": arn, "Tags": self.tags[arn]}
+            for arn in kwargs.get('ResourceArns', []) if arn in self.tags
+        ]}
+    
+    def get_resources(self, **kwargs):
+        mappings = []
+        for arn, tags in self.tags.items():
+            tag_dict = {tag['Key']: tag['Value'] for tag in tags}
+            if all(tag_dict.get(f['Key']) in f['Values'] for f in kwargs.get('TagFilters', [])):
+                mappings.append({"ResourceARN": arn, "Tags": tags})
+        return {"ResourceTagMappingList": mappings}
 
 
-class TestMCPOrchestrator(unittest.TestCase):
-    """Test cases for MCP Orchestrator components."""
+# Output of the docker compose version probes
+COMPOSE_VERSIONS = {
+    ("docker", "compose", "--version"): "Docker Compose version v2.17.2",
+    ("docker-compose", "--version"): "docker-compose version 1.29.2",
+}
+
+
+# docker inspect output of the running test-server container
+INSPECT_OUTPUT = json.dumps([{
+    "Id": "container-id-0",
+    "State": {"Status": "running", "Running": True, "Health": {"Status": "healthy"}},
+    "Created": "2025-06-22T12:00:00Z",
+    "Config": {"Image": "test-image:latest"},
+    "NetworkSettings": {"Ports": {"8080/tcp": [{"HostPort": "8080"}]}}
+}], indent=2)
+
+# docker compose ps --format json row of the running test-server container
+PS_ROW = {
+    "ID": "container-id-0",
+    "Service": "test-server",
+    "State": "running",
+    "Health": "healthy",
+    "CreatedAt": "2025-06-22 12:00:00 +0000 UTC",
+    "Image": "test-image:latest",
+    "Publishers": [
+        {"URL": "", "TargetPort": 9000, "PublishedPort": 0, "Protocol": "tcp"},
+        {"URL": "0.0.0.0", "TargetPort": 8080, "PublishedPort": 8081, "Protocol": "tcp"}
+    ]
+}
+
+# Responses that are the same for every call are built once
+INSPECT_RESPONSE = mock.Mock(returncode=0, stdout=INSPECT_OUTPUT)
+SERVICES_RESPONSE = mock.Mock(returncode=0, stdout="test-server")
+# Older Compose V2 releases print a JSON array, newer ones a JSON object per line
+PS_JSON_ARRAY_RESPONSE = mock.Mock(returncode=0, stdout=json.dumps([PS_ROW]))
+PS_JSON_LINES_RESPONSE = mock.Mock(returncode=0, stdout=json.dumps(PS_ROW) + "\n")
+
+
+def mock_subprocess_run(args, **kwargs):
+    """Answer the docker and docker compose commands run by the compose manager."""
+    # Check for the docker compose and docker-compose version probes
+    version = COMPOSE_VERSIONS.get(tuple(args[:3])) or COMPOSE_VERSIONS.get(tuple(args[:2]))
+    if version is not None:
+        return mock.Mock(returncode=0, stdout=version)
     
-    def setUp(self):
-        """Set up test environment."""
-        # Create temporary config files
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.settings_path = os.path.join(self.temp_dir.name, 'settings.conf')
-        self.compose_path = os.path.join(self.temp_dir.name, 'mcp-compose.yaml')
-        
-        # Create test settings
-        with open(self.settings_path, 'w') as f:
-            f.write('''[aws]
+    is_compose_v2 = args[0:2] == ["docker", "compose"]
+    
+    # Check for --project-directory test
+    if is_compose_v2 and len(args) >= 4 and args[2] == "--project-directory" and "--help" in args:
+        # Simulate Docker Compose without --project-directory support
+        return mock.Mock(returncode=1, stderr="unknown flag: --project-directory\nSee 'docker --help'.")
+    
+    # Check for docker compose ps, with or without --project-directory
+    if (is_compose_v2 and "ps" in args and
+            ((len(args) >= 6 and args[2] == "-f") or
+             (len(args) >= 7 and args[2] == "--project-directory" and args[4] == "-f"))):
+        return PS_JSON_ARRAY_RESPONSE if "json" in args else SERVICES_RESPONSE
+    
+    # Check for docker-compose ps (checking if service exists) - legacy format
+    if (len(args) >= 5 and args[0] == "docker-compose" and
+            args[1] == "-f" and args[3] == "ps" and args[4] == "--services"):
+        return SERVICES_RESPONSE
+    
+    # Check for docker inspect
+    if args[0:2] == ["docker", "inspect"]:
+        return INSPECT_RESPONSE
+    
+    # Default for other commands (like up, restart, etc)
+    return mock.Mock(returncode=0, stdout="")
+
+
+# Config files of the tests, already encoded so they are written as they are
+SETTINGS_CONF = b'''[aws]
 region = us-west-2
 alb_arn = arn:aws:elasticloadbalancing:us-west-2:123456789012:loadbalancer/app/test-alb/abcdef1234567890
 listener_arn = dummy-listener-arn
@@ -191,11 +333,9 @@ path = /monitor
 
 [logging]
 level = DEBUG
-''')
-        
-        # Create test Docker Compose config
-        with open(self.compose_path, 'w') as f:
-            f.write('''version: '3'
+'''
+
+COMPOSE_YAML = b'''version: '3'
 services:
   test-server:
     image: test-image:latest
@@ -213,21 +353,79 @@ services:
       mcp.path: "/mcp/disabled-server"
       mcp.disabled: "true"
       mcp.managed_by: "mcp-orchestrator"
-''')
+'''
+
+
+# Kernel TCP socket tables: listening sockets on ports 8000 and 8002, a connection from port 8001
+PROC_NET_TCP = """  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+   0: 00000000:1F40 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 1001 1
+   1: 0100007F:1F41 0100007F:C350 01 00000000:00000000 00:00000000 00000000     0        0 1002 1
+"""
+PROC_NET_TCP6 = """  sl  local_address                         remote_address                        st tx_queue rx_queue
+   0: 00000000000000000000000000000000:1F42 00000000000000000000000000000000:0000 0A 00000000:00000000
+"""
+
+# Docker run command of a server started by the container manager
+DOCKER_RUN_CONFIG = {'command': 'docker', 'args': ['run', '-i', '--rm', 'mcp/test:latest']}
+
+
+def mock_compose_manager(port, service_info):
+    """Create a compose manager stand-in for the ALB manager.
+    
+    The ALB manager only calls get_port_for_server and get_service_info, so a plain
+    Mock configured in one call is enough, without MagicMock's magic method setup.
+    """
+    return mock.Mock(**{
+        'get_port_for_server.return_value': port,
+        'get_service_info.return_value': service_info,
+    })
+
+
+class TestMCPOrchestrator(unittest.TestCase):
+    """Test cases for MCP Orchestrator components."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Write the config files, which no test changes, once for all tests."""
+        # Create temporary config files
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.settings_path = os.path.join(cls.temp_dir.name, 'settings.conf')
+        cls.compose_path = os.path.join(cls.temp_dir.name, 'mcp-compose.yaml')
         
-        # Create config manager
-        self.config_manager = ConfigManager(
-            compose_path=self.compose_path,
-            settings_path=self.settings_path
-        )
+        # Create test settings and Docker Compose config
+        with open(cls.settings_path, 'wb') as f:
+            f.write(SETTINGS_CONF)
+        with open(cls.compose_path, 'wb') as f:
+            f.write(COMPOSE_YAML)
         
+        # Create config manager, the tests only read the configuration so they share it
+        cls.config_manager = ConfigManager(
+            compose_path=cls.compose_path,
+            settings_path=cls.settings_path
+        )
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the config files."""
+        cls.temp_dir.cleanup()
+    
+    def setUp(self):
+        """Set up test environment."""
         # Set up mocks
         self.docker_mock = MockDockerClient()
         self.aws_mock = MockAWSClient()
+        
+        # Don't reuse AWS clients or the docker compose probe of the previous test
+        alb_manager_module._SHARED_CLIENTS.clear()
+        compose_manager_module._COMPOSE_FLAVOR = None
+        
+        # Read container state through the mocked docker CLI, not a local Docker daemon
+        self.docker_patcher = mock.patch.object(docker, 'from_env', side_effect=DockerException("No Docker daemon in tests"))
+        self.docker_patcher.start()
     
     def tearDown(self):
         """Clean up after tests."""
-        self.temp_dir.cleanup()
+        self.docker_patcher.stop()
     
     def test_config_manager(self):
         """Test configuration manager."""
@@ -237,8 +435,7 @@ services:
         # Test getting MCP servers
         mcp_servers = self.config_manager.get_mcp_servers()
         self.assertEqual(len(mcp_servers), 2)
-        self.assertIn('test-server', mcp_servers)
-        self.assertIn('disabled-server', mcp_servers)
+        self.assertLessEqual({'test-server', 'disabled-server'}, mcp_servers.keys())
         
         # Test getting specific server
         server = self.config_manager.get_mcp_server('test-server')
@@ -249,72 +446,38 @@ services:
         aws_region = self.config_manager.get_setting('aws', 'region')
         self.assertEqual(aws_region, 'us-west-2')
         
+        # Test numeric settings from the file are converted
+        self.assertEqual(self.config_manager.get_setting('service', 'port_range_start'), 8000)
+        
         # Test getting setting with default
         test_setting = self.config_manager.get_setting('nonexistent', 'key', 'default')
         self.assertEqual(test_setting, 'default')
     
-    @mock.patch('subprocess.run')
+    def test_settings_file_parsing(self):
+        """Test the separators and lines the settings file parser accepts."""
+        settings_path = os.path.join(self.temp_dir.name, 'parsing.conf')
+        with open(settings_path, 'w') as f:
+            f.write("orphan = value\n"
+                    "[aws]\n"
+                    "region: eu-west-1\n"
+                    "Listener_ARN = arn:aws:elasticloadbalancing:listener/app=x\n"
+                    "  continued line\n"
+                    "; comment\n")
+        
+        with self.assertLogs('orchestrator.config_manager', 'WARNING') as logs:
+            sections = _parse_settings_file(settings_path)
+        
+        self.assertEqual(sections, {'aws': {
+            'region': 'eu-west-1',
+            'listener_arn': 'arn:aws:elasticloadbalancing:listener/app=x'
+        }})
+        # The key outside a section and the continuation line are reported
+        self.assertEqual(len(logs.output), 2)
+    
+    @mock.patch.object(subprocess, 'run')
     def test_compose_manager(self, mock_subprocess):
         """Test compose manager."""
         
-        # Define a side effect function to handle different commands
-        def mock_subprocess_run(args, **kwargs):
-            # Create a mock response object
-            mock_response = mock.Mock()
-            mock_response.returncode = 0
-            
-            # Check for docker compose version
-            if len(args) >= 3 and args[0:2] == ["docker", "compose"] and args[2] == "--version":
-                mock_response.stdout = "Docker Compose version v2.17.2"
-                return mock_response
-                
-            # Check for docker-compose version (legacy)
-            if len(args) >= 2 and args[0] == "docker-compose" and args[1] == "--version":
-                mock_response.stdout = "docker-compose version 1.29.2"
-                return mock_response
-                
-            # Check for --project-directory test
-            if len(args) >= 4 and args[0:2] == ["docker", "compose"] and args[2] == "--project-directory" and "--help" in args:
-                # Simulate Docker Compose without --project-directory support
-                mock_response.returncode = 1
-                mock_response.stderr = "unknown flag: --project-directory\nSee 'docker --help'."
-                return mock_response
-                
-            # Check for docker compose with simple format (V2 without --project-directory)
-            if (len(args) >= 6 and args[0:2] == ["docker", "compose"] and
-                args[2] == "-f" and "ps" in args):
-                mock_response.stdout = "test-server"
-                return mock_response
-                
-            # Check for docker compose ps with project-directory (full V2 format)
-            if (len(args) >= 7 and args[0:2] == ["docker", "compose"] and
-                args[2] == "--project-directory" and args[4] == "-f" and "ps" in args):
-                mock_response.stdout = "test-server"
-                return mock_response
-                
-            # Check for docker-compose ps (checking if service exists) - legacy format
-            if (len(args) >= 5 and args[0] == "docker-compose" and 
-                args[1] == "-f" and args[3] == "ps" and args[4] == "--services"):
-                mock_response.stdout = "test-server"
-                return mock_response
-                
-            # Check for docker inspect
-            if len(args) >= 2 and args[0] == "docker" and args[1] == "inspect":
-                mock_response.stdout = """[
-  {
-    "Id": "container-id-0",
-    "State": {"Status": "running", "Running": true, "Health": {"Status": "healthy"}},
-    "Created": "2025-06-22T12:00:00Z",
-    "Config": {"Image": "test-image:latest"},
-    "NetworkSettings": {"Ports": {"8080/tcp": [{"HostPort": "8080"}]}}
-  }
-]"""
-                return mock_response
-                
-            # Default for other commands (like up, restart, etc)
-            mock_response.stdout = ""
-            return mock_response
-            
         # Set the side effect for the mock
         mock_subprocess.side_effect = mock_subprocess_run
         
@@ -335,22 +498,90 @@ services:
         
         # Test sync services
         results = compose_manager.sync_services()
-        self.assertIn('created', results)
-        self.assertIn('errors', results)
+        self.assertLessEqual({'created', 'errors'}, results.keys())
+
+    def test_compose_v2_service_listing(self):
+        """Test that Compose V2 ps JSON output, as an array or one object per line, is used without docker inspect."""
+        for ps_format, ps_response in (("array", PS_JSON_ARRAY_RESPONSE), ("lines", PS_JSON_LINES_RESPONSE)):
+            with self.subTest(ps_format=ps_format):
+                compose_manager_module._COMPOSE_FLAVOR = None
+                
+                def run_without_legacy_compose(args, **kwargs):
+                    if args[0] == "docker-compose":
+                        raise FileNotFoundError("docker-compose")
+                    if "json" in args:
+                        return ps_response
+                    return mock_subprocess_run(args, **kwargs)
+                
+                with mock.patch.object(subprocess, 'run', side_effect=run_without_legacy_compose) as mock_run:
+                    compose_manager = ComposeManager(self.config_manager)
+                    self.assertFalse(compose_manager._use_legacy_compose)
+                    info = compose_manager.get_service_info('test-server')
+                
+                self.assertEqual(info['id'], 'container-id-0')
+                self.assertEqual(info['health'], 'healthy')
+                # The first publisher with a published port gives the host port
+                self.assertEqual(info['host_port'], 8081)
+                self.assertFalse(any(call.args[0][:2] == ["docker", "inspect"] for call in mock_run.call_args_list))
+    
+    def test_sync_starts_services_one_by_one_when_batch_fails(self):
+        """Test that one service failing to start doesn't keep the others from being started and reported."""
+        def run_with_broken_server(args, **kwargs):
+            if 'up' in args and 'server-b' in args:
+                return mock.Mock(returncode=1, stdout="", stderr="pull access denied for missing-image")
+            return mock_subprocess_run(args, **kwargs)
+        
+        servers = {service_id: {'disabled': False} for service_id in ('server-a', 'server-b')}
+        compose_data = {'services': {service_id: {} for service_id in servers}}
+        with mock.patch.object(subprocess, 'run', side_effect=run_with_broken_server):
+            compose_manager = ComposeManager(self.config_manager)
+            compose_manager.port_allocations['server-a'] = 8000
+            with mock.patch.object(self.config_manager, 'get_mcp_servers', return_value=servers), \
+                    mock.patch.object(self.config_manager, 'load_compose_data', return_value=compose_data), \
+                    mock.patch.object(compose_manager, '_refresh_running_services', return_value=set()):
+                results = compose_manager.sync_services()
+        
+        self.assertEqual(results['created'], ['server-a'])
+        self.assertEqual(results['errors'], ['server-b: failed to start'])
+        # The started service's port is looked up again
+        self.assertNotIn('server-a', compose_manager.port_allocations)
+    
+    @mock.patch.object(subprocess, 'run', side_effect=mock_subprocess_run)
+    def test_cached_state_expires_while_following_events(self, mock_subprocess):
+        """Test that followed docker events extend the cache lifetime without making it unlimited."""
+        compose_manager = ComposeManager(self.config_manager)
+        compose_manager._events_active = True
+        cached_at = time.monotonic()
+        self.assertTrue(compose_manager._is_fresh(cached_at - compose_manager_module.STATE_CACHE_TTL))
+        self.assertFalse(compose_manager._is_fresh(cached_at - compose_manager_module.EVENTS_CACHE_TTL))
     
-    @mock.patch('boto3.client')
+    @mock.patch.object(subprocess, 'run', side_effect=mock_subprocess_run)
+    def test_sync_starts_new_services_together(self, mock_subprocess):
+        """Test that services missing at sync time are started with one docker compose up."""
+        compose_manager = ComposeManager(self.config_manager)
+        servers = {service_id: {'disabled': False} for service_id in ('server-a', 'server-b')}
+        compose_data = {'services': {service_id: {} for service_id in servers}}
+        with mock.patch.object(self.config_manager, 'get_mcp_servers', return_value=servers), \
+                mock.patch.object(self.config_manager, 'load_compose_data', return_value=compose_data), \
+                mock.patch.object(compose_manager, '_refresh_running_services', return_value=set()):
+            results = compose_manager.sync_services()
+
+        self.assertCountEqual(results['created'], servers)
+        up_calls = [call.args[0] for call in mock_subprocess.call_args_list if 'up' in call.args[0]]
+        self.assertEqual(len(up_calls), 1)
+        self.assertEqual(up_calls[0][-2:], ['server-a', 'server-b'])
+
+    @mock.patch.object(boto3, 'client')
     def test_alb_manager(self, mock_boto3):
         """Test ALB manager."""
         mock_boto3.return_value = self.aws_mock
         
         # Mock the container manager
-        container_manager = mock.MagicMock()
-        container_manager.get_port_for_server.return_value = 8080
-        container_manager.get_container_info.return_value = {
+        container_manager = mock_compose_manager(8080, {
             'exists': True, 
             'running': True, 
             'host_port': 8080
-        }
+        })
         
         # Create ALB manager
         alb_manager = ALBManager(self.config_manager, container_manager)
@@ -369,104 +600,282 @@ services:
         # Test setting up ALB for server
         setup_results = alb_manager.setup_alb_for_server('test-server')
         # Just check that the setup_results dict contains the expected keys
-        self.assertIn('target_group_created', setup_results)
-        self.assertIn('rule_created', setup_results)
+        self.assertLessEqual({'target_group_created', 'rule_created'}, setup_results.keys())
         
         # Test sync ALB
         sync_results = alb_manager.sync_alb()
-        self.assertIn('created', sync_results)
-        self.assertIn('errors', sync_results)
+        self.assertLessEqual({'created', 'errors'}, sync_results.keys())
     
-    def test_integration(self):
-        """Test integration between components."""
-        # Create mocks
-        with mock.patch('subprocess.run') as mock_subprocess, \
-             mock.patch('boto3.client', return_value=self.aws_mock):
-            
-            # Define a side effect function to handle different commands
-            def mock_subprocess_run(args, **kwargs):
-                # Create a mock response object
-                mock_response = mock.Mock()
-                mock_response.returncode = 0
-                
-                # Check for docker compose version
-                if len(args) >= 3 and args[0:2] == ["docker", "compose"] and args[2] == "--version":
-                    mock_response.stdout = "Docker Compose version v2.17.2"
-                    return mock_response
-                    
-                # Check for docker-compose version (legacy)
-                if len(args) >= 2 and args[0] == "docker-compose" and args[1] == "--version":
-                    mock_response.stdout = "docker-compose version 1.29.2"
-                    return mock_response
-                    
-                # Check for --project-directory test
-                if len(args) >= 4 and args[0:2] == ["docker", "compose"] and args[2] == "--project-directory" and "--help" in args:
-                    # Simulate Docker Compose without --project-directory support
-                    mock_response.returncode = 1
-                    mock_response.stderr = "unknown flag: --project-directory\nSee 'docker --help'."
-                    return mock_response
-                    
-                # Check for docker compose ps with project-directory (modern approach)
-                if (len(args) >= 7 and args[0:2] == ["docker", "compose"] and
-                    args[2] == "--project-directory" and args[4] == "-f" and "ps" in args):
-                    mock_response.stdout = "test-server"
-                    return mock_response
-                    
-                # Check for docker compose ps (checking if service exists) - new format
-                if (len(args) >= 6 and args[0:2] == ["docker", "compose"] and 
-                    args[2] == "-f" and args[4] == "ps" and args[5] == "--services"):
-                    mock_response.stdout = "test-server"
-                    return mock_response
-                    
-                # Check for docker-compose ps (checking if service exists) - legacy format
-                if (len(args) >= 5 and args[0] == "docker-compose" and 
-                    args[1] == "-f" and args[3] == "ps" and args[4] == "--services"):
-                    mock_response.stdout = "test-server"
-                    return mock_response
-                    
-                # Check for docker inspect
-                if len(args) >= 2 and args[0] == "docker" and args[1] == "inspect":
-                    mock_response.stdout = """[
-  {
-    "Id": "container-id-0",
-    "State": {"Status": "running", "Running": true, "Health": {"Status": "healthy"}},
-    "Created": "2025-06-22T12:00:00Z",
-    "Config": {"Image": "test-image:latest"},
-    "NetworkSettings": {"Ports": {"8080/tcp": [{"HostPort": "8080"}]}}
-  }
-]"""
-                    return mock_response
-                    
-                # Default for other commands (like up, restart, etc)
-                mock_response.stdout = ""
-                return mock_response
-                
-            # Set the side effect for the mock
-            mock_subprocess.side_effect = mock_subprocess_run
-            
-            # Create managers
-            compose_manager = ComposeManager(self.config_manager)
-            alb_manager = ALBManager(self.config_manager, compose_manager)
-            
-            # Test full workflow
-            # 1. Sync services
-            service_results = compose_manager.sync_services()
-            self.assertGreaterEqual(len(service_results['created']), 0)
-            
-            # 2. Check service info
-            info = compose_manager.get_service_info('test-server')
-            self.assertTrue(info['exists'])
-            
-            # 3. Set up ALB
-            alb_results = alb_manager.setup_alb_for_server('test-server')
-            # Only validate that alb_results is a dict with expected structure
-            self.assertIsInstance(alb_results, dict)
-            self.assertIn('target_group_created', alb_results)
-            self.assertIn('rule_created', alb_results)
+    @mock.patch.object(boto3, 'client')
+    def test_alb_sync_removes_orphans(self, mock_boto3):
+        """Test that target groups of removed servers are cleaned up."""
+        mock_boto3.return_value = self.aws_mock
+        
+        container_manager = mock_compose_manager(None, {'exists': False})
+        alb_manager = ALBManager(self.config_manager, container_manager)
+        
+        # Target group left behind by a server that is no longer configured
+        orphan = self.aws_mock.create_target_group(Name='tg-mcp-removed-server')['TargetGroups'][0]
+        self.aws_mock.add_tags(
+            ResourceArns=[orphan['TargetGroupArn']],
+            Tags=[
+                {'Key': 'ManagedBy', 'Value': 'mcp-orchestrator'},
+                {'Key': 'MCPService', 'Value': 'removed-server'}
+            ]
+        )
+        
+        sync_results = alb_manager.sync_alb()
+        self.assertIn('removed-server', sync_results['deleted'])
+        self.assertNotIn('tg-mcp-removed-server', self.aws_mock.target_groups)
+    
+    @mock.patch.object(boto3, 'client')
+    def test_tagging_api_not_retried_after_access_denied(self, mock_boto3):
+        """Test that managed target groups are found with describe_tags once the tagging API denied access."""
+        mock_boto3.return_value = self.aws_mock
+        alb_manager = ALBManager(self.config_manager, mock_compose_manager(8080, {'exists': True}))
+        tg_arn = alb_manager.create_target_group('test-server')
+        
+        access_denied = ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': 'denied'}}, 'GetResources')
+        with mock.patch.object(MockAWSClient, 'get_resources', side_effect=access_denied) as get_resources:
+            self.assertIn(tg_arn, alb_manager._get_managed_target_groups())
+            self.assertIn(tg_arn, alb_manager._get_managed_target_groups())
+        self.assertEqual(get_resources.call_count, 1)
+    
+    @mock.patch.object(boto3, 'client')
+    def test_register_target_looks_up_port_after_separate_create(self, mock_boto3):
+        """Test that only setup_alb_for_server hands the port over from target group creation."""
+        mock_boto3.return_value = self.aws_mock
+        compose_manager = mock_compose_manager(8080, {'exists': True})
+        alb_manager = ALBManager(self.config_manager, compose_manager)
+        
+        with mock.patch.object(alb_manager, '_get_instance_id', return_value='i-test'), \
+                mock.patch.object(MockAWSClient, 'register_targets', return_value={}) as register_targets:
+            alb_manager.create_target_group('test-server')
+            # The service came back on another port before the target was registered
+            compose_manager.get_port_for_server.return_value = 9090
+            self.assertTrue(alb_manager.register_target('test-server'))
+            self.assertEqual(register_targets.call_args.kwargs['Targets'], [{'Id': 'i-test', 'Port': 9090}])
             
-            # 4. Sync ALB
-            alb_sync_results = alb_manager.sync_alb()
-            self.assertGreaterEqual(len(alb_sync_results['created']), 0)
+            self.aws_mock.target_groups.clear()
+            alb_manager.target_groups.clear()
+            compose_manager.get_port_for_server.reset_mock()
+            self.assertTrue(alb_manager.setup_alb_for_server('test-server')['target_registered'])
+            self.assertEqual(compose_manager.get_port_for_server.call_count, 1)
+    
+    @mock.patch.object(boto3, 'client')
+    def test_rules_listed_again_after_sync(self, mock_boto3):
+        """Test that rule lookups after a sync see rule changes made since."""
+        mock_boto3.return_value = self.aws_mock
+        alb_manager = ALBManager(self.config_manager,
+                                 mock_compose_manager(8080, {'exists': True, 'running': True}))
+        alb_manager.sync_alb()
+        self.assertIsNotNone(alb_manager._rule_exists_for_path('/mcp/test-server/*'))
+        
+        # Replace the rule of the server by a rule for another path
+        self.aws_mock.rules.clear()
+        self.aws_mock.create_rule(Priority=2, Conditions=[{'Field': 'path-pattern', 'Values': ['/other/*']}])
+        
+        self.assertIsNone(alb_manager._rule_exists_for_path('/mcp/test-server/*'))
+        self.assertEqual(alb_manager._get_next_available_priority(), 1)
+    
+    @mock.patch.object(boto3, 'client')
+    def test_sync_reports_disabled_servers_on_both_paths(self, mock_boto3):
+        """Test that disabled servers are reported as deleted whether or not the listings succeeded."""
+        mock_boto3.return_value = self.aws_mock
+        alb_manager = ALBManager(self.config_manager, mock_compose_manager(None, {'exists': False}))
+        self.assertEqual(alb_manager.sync_alb()['deleted'], ['disabled-server'])
+        
+        listing_failed = ClientError({'Error': {'Code': 'ValidationError', 'Message': 'failed'}}, 'DescribeRules')
+        with mock.patch.object(MockAWSClient, 'describe_rules', side_effect=listing_failed):
+            self.assertEqual(alb_manager.sync_alb()['deleted'], ['disabled-server'])
+    
+    @mock.patch.object(boto3, 'client')
+    def test_sync_not_disturbed_by_concurrent_sync(self, mock_boto3):
+        """Test that a sync finishing while another one runs leaves the other's rule listing alone."""
+        mock_boto3.return_value = self.aws_mock
+        compose_manager = mock_compose_manager(8080, {'exists': True, 'running': True})
+        alb_manager = ALBManager(self.config_manager, compose_manager)
+        
+        # A second sync runs to completion while the first one looks up the enabled server
+        def run_other_sync(server_id):
+            compose_manager.get_service_info.side_effect = None
+            alb_manager.sync_alb()
+            return compose_manager.get_service_info.return_value
+        compose_manager.get_service_info.side_effect = run_other_sync
+        
+        self.assertEqual(alb_manager.sync_alb()['errors'], [])
+    
+    @mock.patch.object(boto3, 'client')
+    def test_instance_id_retried_after_metadata_failure(self, mock_boto3):
+        """Test that the dummy instance ID is not kept once the metadata service answers."""
+        mock_boto3.return_value = self.aws_mock
+        alb_manager = ALBManager(self.config_manager, mock_compose_manager(8080, {'exists': True}))
+        
+        metadata_session = mock.Mock()
+        metadata_session.put.return_value = mock.Mock(status_code=200, text='token')
+        metadata_session.get.return_value = mock.Mock(status_code=200, text='i-0123456789abcdef0')
+        with mock.patch.object(alb_manager_module, '_get_imds_session',
+                               side_effect=[ConnectionError("timed out"), metadata_session, metadata_session]):
+            self.assertEqual(alb_manager._get_instance_id(), alb_manager_module.DUMMY_INSTANCE_ID)
+            self.assertEqual(alb_manager._get_instance_id(), 'i-0123456789abcdef0')
+            # The real instance ID is cached, the metadata service isn't asked again
+            self.assertEqual(alb_manager._get_instance_id(), 'i-0123456789abcdef0')
+            self.assertEqual(metadata_session.get.call_count, 1)
+    
+    def _container_manager(self):
+        """Create a container manager talking to a mocked Docker client and API client."""
+        client = mock.Mock(spec=docker.DockerClient)
+        client.api = mock.Mock(spec=docker.APIClient)
+        client.api.inspect_container.side_effect = NotFound("No such container")
+        with mock.patch.object(docker, 'from_env', return_value=client):
+            return ContainerManager(self.config_manager), client
+    
+    def test_listening_ports_read_from_tcp_tables(self):
+        """Test that only listening sockets of the IPv4 and IPv6 tables are reported."""
+        tcp_paths = []
+        for name, content in (('tcp', PROC_NET_TCP), ('tcp6', PROC_NET_TCP6)):
+            tcp_paths.append(os.path.join(self.temp_dir.name, name))
+            with open(tcp_paths[-1], 'w') as f:
+                f.write(content)
+        
+        with mock.patch.object(container_manager_module, 'PROC_NET_TCP_FILES', tuple(tcp_paths)):
+            self.assertEqual(container_manager_module._get_listening_ports(), {8000, 8002})
+        
+        missing_path = os.path.join(self.temp_dir.name, 'missing')
+        with mock.patch.object(container_manager_module, 'PROC_NET_TCP_FILES', (missing_path,)):
+            self.assertIsNone(container_manager_module._get_listening_ports())
+    
+    def test_find_available_port_skips_used_ports(self):
+        """Test that allocated and listening ports are skipped, and a full range is an error."""
+        container_manager, _ = self._container_manager()
+        container_manager.port_allocations['other-server'] = 8001
+        
+        with mock.patch.object(container_manager_module, '_get_listening_ports', return_value={8000, 8002}):
+            self.assertEqual(container_manager._find_available_port(), 8003)
+            with mock.patch.object(self.config_manager, 'get_setting', side_effect=lambda section, key, default=None:
+                                   {'port_range_start': 8000, 'port_range_end': 8002}.get(key, default)):
+                self.assertRaises(RuntimeError, container_manager._find_available_port)
+    
+    @mock.patch.object(container_manager_module.time, 'sleep')
+    def test_create_container_retries_transient_errors(self, mock_sleep):
+        """Test that daemon errors are retried and client errors are not."""
+        container_manager, client = self._container_manager()
+        client.api.create_container.side_effect = [
+            APIError("daemon busy", response=mock.Mock(status_code=500)),
+            {'Id': 'container-id-1'}
+        ]
+        with mock.patch.object(container_manager_module, '_get_listening_ports', return_value=set()):
+            self.assertEqual(container_manager.create_container('test-server', DOCKER_RUN_CONFIG), 'container-id-1')
+        self.assertEqual(client.api.create_container.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+        client.api.start.assert_called_once_with('container-id-1')
+        self.assertEqual(container_manager.port_allocations['test-server'], 8000)
+        
+        client.api.create_container.reset_mock()
+        client.api.create_container.side_effect = APIError("conflict", response=mock.Mock(status_code=409))
+        with mock.patch.object(container_manager_module, '_get_listening_ports', return_value=set()):
+            self.assertIsNone(container_manager.create_container('other-server', DOCKER_RUN_CONFIG))
+        self.assertEqual(client.api.create_container.call_count, 1)
+    
+    def test_create_container_pulls_missing_image(self):
+        """Test that the image is pulled only when it isn't present locally."""
+        container_manager, client = self._container_manager()
+        client.api.create_container.side_effect = [ImageNotFound("No such image"), {'Id': 'container-id-2'}]
+        
+        with mock.patch.object(container_manager_module, '_get_listening_ports', return_value=set()):
+            self.assertEqual(container_manager.create_container('test-server', DOCKER_RUN_CONFIG), 'container-id-2')
+        client.images.pull.assert_called_once_with('mcp/test:latest')
+        
+        # An existing container is returned without creating another one
+        client.api.inspect_container.side_effect = None
+        client.api.inspect_container.return_value = {'Id': 'container-id-2'}
+        client.api.create_container.reset_mock()
+        self.assertEqual(container_manager.create_container('test-server', DOCKER_RUN_CONFIG), 'container-id-2')
+        client.api.create_container.assert_not_called()
+    
+    def test_sync_containers(self):
+        """Test that servers are restarted or stopped and orphaned containers removed."""
+        container_manager, client = self._container_manager()
+        containers = {}
+        for name in ('mcp-test-server', 'mcp-disabled-server', 'mcp-removed-server'):
+            # The name argument of Mock names the mock itself, so the attribute is set afterwards
+            containers[name] = mock.Mock(spec=MockDockerContainer)
+            containers[name].name = name
+        client.containers.list.return_value = list(containers.values())
+        
+        results = container_manager.sync_containers()
+        
+        self.assertEqual(results['updated'], ['test-server'])
+        self.assertCountEqual(results['stopped'], ['disabled-server', 'mcp-removed-server'])
+        self.assertEqual(results['errors'], [])
+        containers['mcp-test-server'].restart.assert_called_once_with(timeout=10)
+        containers['mcp-disabled-server'].stop.assert_called_once_with(timeout=10)
+        containers['mcp-removed-server'].remove.assert_called_once_with(force=True, v=False)
+        client.containers.list.assert_called_once_with(all=True, filters={"label": "managed_by=mcp-orchestrator"})
+    
+    def _dashboard_client(self, compose_manager, dashboard_cache=None):
+        """Create a dashboard test client logged in as the configured user."""
+        app = dashboard_app_module.create_app(self.config_manager, compose_manager, mock.Mock(), dashboard_cache)
+        client = app.test_client()
+        client.post('/auth/login', data={'username': 'admin', 'password': 'test123'})
+        return client
+    
+    def test_dashboard_fetches_service_info_when_snapshot_missing(self):
+        """Test that the dashboard pages read the state through the compose manager."""
+        compose_manager = mock.Mock(spec=ComposeManager, **{'get_all_service_info.return_value': {
+            'test-server': {'exists': True, 'running': True, 'host_port': 8080}
+        }})
+        client = self._dashboard_client(compose_manager)
+        
+        response = client.get('/api/state')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['stats']['running'], 1)
+        compose_manager.get_all_service_info.assert_called_once_with()
+    
+    def test_dashboard_not_modified(self):
+        """Test that a page is answered with 304 only for an ETag of the same process and snapshot."""
+        compose_manager = mock.Mock(spec=ComposeManager, **{'get_all_service_info.return_value': {}})
+        client = self._dashboard_client(compose_manager)
+        etag = client.get('/').headers['ETag']
+        
+        response = client.get('/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        
+        # A restarted dashboard numbers its snapshots from the start again
+        restarted_client = self._dashboard_client(compose_manager)
+        response = restarted_client.get('/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+    
+    @mock.patch.object(boto3, 'client')
+    @mock.patch.object(subprocess, 'run', side_effect=mock_subprocess_run)
+    def test_integration(self, mock_subprocess, mock_boto3):
+        """Test integration between components."""
+        mock_boto3.return_value = self.aws_mock
+        
+        # Create managers
+        compose_manager = ComposeManager(self.config_manager)
+        alb_manager = ALBManager(self.config_manager, compose_manager)
+        
+        # Test full workflow
+        # 1. Sync services
+        service_results = compose_manager.sync_services()
+        self.assertGreaterEqual(len(service_results['created']), 0)
+        
+        # 2. Check service info
+        info = compose_manager.get_service_info('test-server')
+        self.assertTrue(info['exists'])
+        
+        # 3. Set up ALB
+        alb_results = alb_manager.setup_alb_for_server('test-server')
+        # Only validate that alb_results is a dict with expected structure
+        self.assertIsInstance(alb_results, dict)
+        self.assertLessEqual({'target_group_created', 'rule_created'}, alb_results.keys())
+        
+        # 4. Sync ALB
+        alb_sync_results = alb_manager.sync_alb()
+        self.assertGreaterEqual(len(alb_sync_results['created']), 0)
 
 
 def main():
@@ -474,9 +883,11 @@ def main():
     # Set up logging
     logger = setup_logging("test")
     
-    # Run tests
-    unittest.main()
+    # Run tests, loading them from the test case directly instead of scanning the module
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestMCPOrchestrator)
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+    return 0 if result.wasSuccessful() else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())